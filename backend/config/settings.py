@@ -1,14 +1,20 @@
 """
 UltraChat - Application Settings
 Configurable settings with environment variable support and persistent storage.
+
+Environment overrides use the ULTRACHAT_ prefix (e.g. ULTRACHAT_PORT=9000) and
+"__" for nested fields (e.g. ULTRACHAT_CHAT_DEFAULTS__TEMPERATURE=0.5). They are
+read once per process and only fill in values not present in config.json.
 """
 
 import os
 import json
+import asyncio
+import functools
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from pydantic import BaseModel
-from pydantic_settings import BaseSettings
 
 from .constants import (
     DEFAULT_MODEL,
@@ -63,6 +69,7 @@ class ModelSettings(BaseModel):
     default_quantization: str = DEFAULT_QUANTIZATION
     auto_load_last: bool = True  # Auto-load last used model on startup
     use_torch_compile: bool = False  # torch.compile (experimental, may cause issues on some PyTorch versions)
+    use_static_cache: bool = False  # Static KV cache (with torch.compile: CUDA-graph decode; first call compiles)
     attention_implementation: str = DEFAULT_ATTENTION_IMPLEMENTATION  # "auto", "flash_attention_2", "sdpa", "eager"
 
 
@@ -97,6 +104,10 @@ class VoiceSettings(BaseModel):
     chunk_max_words: int = 16
     chunk_max_wait_s: float = 0.7
     auto_load_tts: bool = False  # Auto-load TTS on startup
+    prefetch_tts_voices: bool = False  # Download preset TTS voices on startup
+    tts_quantize: bool = True  # Dynamic int8 quantization of the TTS FlowLM transformer (CPU)
+    tts_quantize_groups: List[Literal["attention", "ffn"]] = ["attention", "ffn"]
+    tts_bf16: bool = False  # BF16 autocast for the TTS FlowLM (CPUs with native BF16 only)
 
 
 class SpeculativeDecodingSettings(BaseModel):
@@ -106,7 +117,7 @@ class SpeculativeDecodingSettings(BaseModel):
     assistant_tokens_schedule: str = DEFAULT_ASSISTANT_TOKENS_SCHEDULE  # "constant" or "heuristic"
 
 
-class AppSettings(BaseSettings):
+class AppSettings(BaseModel):
     """Main application settings."""
     app_name: str = "UltraChat"
     version: str = "1.0.0"
@@ -121,9 +132,105 @@ class AppSettings(BaseSettings):
     ui: UISettings = UISettings()
     voice: VoiceSettings = VoiceSettings()
     speculative_decoding: SpeculativeDecodingSettings = SpeculativeDecodingSettings()
-    
-    class Config:
-        env_prefix = "ULTRACHAT_"
+
+
+@functools.lru_cache(maxsize=1)
+def _resolved_data_dir() -> Path:
+    """Resolve the data directory once (the environment is fixed after startup)."""
+    custom_dir = os.environ.get("ULTRACHAT_DATA_DIR")
+    if custom_dir:
+        return Path(custom_dir)
+    # Default to data directory next to backend
+    return Path(__file__).parent.parent.parent / "data"
+
+
+ENV_PREFIX = "ULTRACHAT_"
+ENV_NESTED_DELIMITER = "__"
+
+
+@functools.lru_cache(maxsize=1)
+def _env_overrides() -> Dict[str, Any]:
+    """Map ULTRACHAT_* environment variables onto AppSettings fields (scanned once)."""
+    overrides: Dict[str, Any] = {}
+    for name, value in os.environ.items():
+        if not name.upper().startswith(ENV_PREFIX):
+            continue
+        path = name[len(ENV_PREFIX):].lower().split(ENV_NESTED_DELIMITER)
+        field_info = AppSettings.model_fields.get(path[0])
+        if field_info is None:
+            continue  # e.g. ULTRACHAT_DATA_DIR, handled by _resolved_data_dir()
+        
+        is_section = isinstance(field_info.default, BaseModel)
+        if len(path) > (2 if is_section else 1):
+            # Sections are one level deep and scalars have no sub-fields (e.g. ULTRACHAT_PORT__X)
+            print(f"Warning: Ignoring {name}: no such nested setting.")
+            continue
+        
+        if len(path) == 1 and is_section:
+            # Whole section given as JSON, e.g. ULTRACHAT_UI='{"theme": "light"}'
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = None
+            if not isinstance(value, dict):
+                print(f"Warning: Ignoring {name}: expected a JSON object.")
+                continue
+        
+        if len(path) == 1:
+            overrides[path[0]] = value
+        else:
+            overrides.setdefault(path[0], {})[path[1]] = value
+    return overrides
+
+
+def _deep_merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    """Return base updated with overlay, merging nested dicts."""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(merged.get(key), dict) and isinstance(value, dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _parse_settings(raw: bytes) -> AppSettings:
+    """Parse config.json contents; file values take precedence over the environment."""
+    overrides = _env_overrides()
+    if not overrides:
+        return AppSettings.model_validate_json(raw)
+    return AppSettings.model_validate(_deep_merge(overrides, json.loads(raw)))
+
+
+# Parsed config keyed on (path, mtime_ns, size) so unchanged files are never re-parsed
+_parse_cache: Dict[Tuple[str, int, int], AppSettings] = {}
+
+
+def _read_settings_file(path: Path) -> AppSettings:
+    """Load settings from a config file, reusing the last parse if the file is unchanged."""
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    settings = _parse_cache.get(key)
+    if settings is None:
+        settings = _parse_settings(path.read_bytes())
+        _parse_cache.clear()  # Only the latest version is ever useful
+        _parse_cache[key] = settings
+    return settings
+
+
+@functools.lru_cache(maxsize=1)
+def _env_settings() -> AppSettings:
+    """Defaults merged with ULTRACHAT_* environment variables, scanned once."""
+    return AppSettings.model_validate(_env_overrides())
+
+
+_MISSING = object()
+_LOCK = threading.Lock()
+
+
+def _default_settings() -> AppSettings:
+    """Fresh copy of the environment-derived defaults."""
+    return _env_settings().model_copy(deep=True)
 
 
 class SettingsManager:
@@ -135,27 +242,34 @@ class SettingsManager:
     _instance: Optional['SettingsManager'] = None
     _settings: Optional[AppSettings] = None
     _config_path: Optional[Path] = None
+    _config_mtime_ns: Optional[int] = None
+    _write_lock: Optional[asyncio.Lock] = None  # Serializes async updates and their file writes
+    _lookup_cache: Dict[str, Any] = {}
+    _storage_paths: Dict[str, Path] = {}
+    _ensured_dirs: set = set()  # Directories already created by this process
+    _initialized: bool = False
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with _LOCK:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
     
     def __init__(self):
-        if self._settings is None:
+        if self._initialized:
+            return
+        with _LOCK:
+            # Another thread may have finished loading while we waited
+            if self._initialized:
+                return
             self._load_settings()
+            self._initialized = True
     
     def _get_config_path(self) -> Path:
         """Get the configuration file path."""
-        # First check for environment variable
-        custom_dir = os.environ.get("ULTRACHAT_DATA_DIR")
-        if custom_dir:
-            base_dir = Path(custom_dir)
-        else:
-            # Default to data directory next to backend
-            base_dir = Path(__file__).parent.parent.parent / "data"
-        
-        base_dir.mkdir(parents=True, exist_ok=True)
+        base_dir = _resolved_data_dir()
+        self._ensure_dir(base_dir)
         return base_dir / "config.json"
     
     def _load_settings(self):
@@ -164,19 +278,27 @@ class SettingsManager:
         
         if self._config_path.exists():
             try:
-                with open(self._config_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self._settings = AppSettings(**data)
+                self._settings = _read_settings_file(self._config_path)
             except Exception as e:
                 print(f"Warning: Could not load config: {e}. Using defaults.")
-                self._settings = AppSettings()
+                self._settings = _default_settings()
         else:
-            self._settings = AppSettings()
+            self._settings = _default_settings()
             self._save_settings()
         
+        self._config_mtime_ns = self._stat_config_mtime()
+        self._lookup_cache = {}
+        self._settings_changed()
+        
         # Ensure directories exist
         self._ensure_directories()
     
+    def _ensure_dir(self, dir_path: Path):
+        """mkdir once per path per process instead of on every settings change."""
+        if dir_path not in self._ensured_dirs:
+            dir_path.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(dir_path)
+    
     def _ensure_directories(self):
         """Create necessary directories."""
         storage = self._settings.storage
@@ -191,14 +313,80 @@ class SettingsManager:
         ]
         
         for dir_path in dirs_to_create:
-            dir_path.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(dir_path)
     
     def _save_settings(self):
         """Persist settings to file."""
         if self._config_path and self._settings:
-            self._config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self._config_path, "w", encoding="utf-8") as f:
-                json.dump(self._settings.model_dump(), f, indent=2)
+            self._config_written(self._write_config(self._settings.model_dump_json(indent=2)))
+    
+    async def _asave_settings(self):
+        """Persist settings without blocking the event loop on disk I/O. Call with the write lock held."""
+        if self._config_path and self._settings:
+            # Serialize on the loop so a concurrent update can't change what gets written
+            mtime_ns = await asyncio.to_thread(self._write_config, self._settings.model_dump_json(indent=2))
+            self._config_written(mtime_ns)
+    
+    def _write_config(self, data: str) -> Optional[int]:
+        """Atomically replace the config file with data and return its new mtime."""
+        self._ensure_dir(self._config_path.parent)
+        tmp_path = self._config_path.with_name(self._config_path.name + ".tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, self._config_path)
+        return self._stat_config_mtime()
+    
+    def _config_written(self, mtime_ns: Optional[int]):
+        """Record our own write so it isn't mistaken for an external edit."""
+        _parse_cache.clear()
+        self._config_mtime_ns = mtime_ns
+    
+    def _get_write_lock(self) -> asyncio.Lock:
+        """Lock shared by async updates; created lazily on the running loop."""
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        return self._write_lock
+    
+    async def _aload_settings(self):
+        """Re-read the config file off the event loop if it changed on disk."""
+        mtime_ns = await asyncio.to_thread(self._stat_config_mtime)
+        if mtime_ns is None or mtime_ns == self._config_mtime_ns:
+            return
+        try:
+            self._settings = await asyncio.to_thread(_read_settings_file, self._config_path)
+        except Exception:
+            pass  # Use cached settings on error
+        self._config_mtime_ns = mtime_ns
+        self._settings_changed()
+    
+    def _stat_config_mtime(self) -> Optional[int]:
+        """Modification time of the config file, or None if it is missing."""
+        try:
+            return self._config_path.stat().st_mtime_ns
+        except (OSError, AttributeError):
+            return None
+    
+    def _reload_if_changed(self):
+        """Re-read the config file only when it was modified outside this manager."""
+        mtime_ns = self._stat_config_mtime()
+        if mtime_ns is None or mtime_ns == self._config_mtime_ns:
+            return
+        try:
+            self._settings = _read_settings_file(self._config_path)
+        except Exception:
+            pass  # Use cached settings on error
+        self._config_mtime_ns = mtime_ns
+        self._settings_changed()
+    
+    def _settings_changed(self):
+        """Refresh derived state after the settings object is replaced."""
+        self._lookup_cache.clear()
+        storage = self._settings.storage
+        self._storage_paths = {
+            "db": self.get_absolute_path(storage.db_name),
+            "memories": self.get_absolute_path(storage.memories_dir),
+            "exports": self.get_absolute_path(storage.exports_dir),
+            "models": self.get_absolute_path(storage.models_dir),
+        }
     
     @property
     def settings(self) -> AppSettings:
@@ -206,79 +394,116 @@ class SettingsManager:
         return self._settings
     
     def get(self, key: str, default=None):
-        """Get a setting value by key (supports dot notation). Re-reads from disk to catch updates."""
-        # Re-read config file to catch any external updates (e.g., from frontend save)
-        if self._config_path and self._config_path.exists():
-            try:
-                with open(self._config_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self._settings = AppSettings(**data)
-            except Exception:
-                pass  # Use cached settings on error
+        """Get a setting value by key (supports dot notation). Picks up external edits to the config file."""
+        self._reload_if_changed()
         
-        keys = key.split(".")
-        value = self._settings.model_dump()
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        value = self._lookup_cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._settings
+            for k in key.split("."):
+                value = getattr(value, k, _MISSING)
+                if value is _MISSING:
+                    return default
+            self._lookup_cache[key] = value
         
+        # Callers expect plain dicts for whole sections
+        if isinstance(value, BaseModel):
+            return value.model_dump()
         return value
     
     def update(self, **kwargs) -> AppSettings:
         """Update settings and persist."""
-        current_data = self._settings.model_dump()
+        self._apply_update(kwargs)
+        self._save_settings()
+        self._ensure_directories()
+        return self._settings
+    
+    async def aupdate(self, **kwargs) -> AppSettings:
+        """Update settings and persist from async code (file I/O runs in a worker thread)."""
+        # Hold the lock across apply + write so concurrent PATCHes land on disk in order
+        async with self._get_write_lock():
+            self._apply_update(kwargs)
+            await self._asave_settings()
+            await asyncio.to_thread(self._ensure_directories)
+            return self._settings
+    
+    async def arefresh(self) -> AppSettings:
+        """Pick up external edits to the config file from async code."""
+        async with self._get_write_lock():
+            await self._aload_settings()
+            return self._settings
+    
+    def _apply_update(self, kwargs: Dict[str, Any]):
+        """Merge updates into the in-memory settings."""
+        updates = {}
         
-        # Deep merge updates
+        # Validate only the sections being changed; untouched sections are shared as-is.
+        # A ValidationError here leaves the current settings (and config.json) untouched.
         for key, value in kwargs.items():
-            if key in current_data:
-                if isinstance(current_data[key], dict) and isinstance(value, dict):
-                    current_data[key].update(value)
+            if key in AppSettings.model_fields:
+                current = getattr(self._settings, key)
+                if isinstance(current, BaseModel) and isinstance(value, dict):
+                    updates[key] = type(current).model_validate({**current.model_dump(), **value})
                 else:
-                    current_data[key] = value
+                    updates[key] = getattr(AppSettings.model_validate({key: value}), key)
         
-        self._settings = AppSettings(**current_data)
-        self._save_settings()
-        self._ensure_directories()
-        return self._settings
+        self._settings = self._settings.model_copy(update=updates)
+        self._settings_changed()
     
     def get_absolute_path(self, relative_path: str) -> Path:
         """Convert a relative storage path to absolute."""
-        if Path(relative_path).is_absolute():
-            return Path(relative_path)
+        path = Path(relative_path)
+        if path.is_absolute():
+            return path
         return self._config_path.parent / relative_path
     
     def get_db_path(self) -> Path:
         """Get absolute database path."""
-        return self.get_absolute_path(self._settings.storage.db_name)
+        return self._storage_paths["db"]
     
     def get_memories_path(self) -> Path:
         """Get absolute memories directory path."""
-        return self.get_absolute_path(self._settings.storage.memories_dir)
+        return self._storage_paths["memories"]
     
     def get_exports_path(self) -> Path:
         """Get absolute exports directory path."""
-        return self.get_absolute_path(self._settings.storage.exports_dir)
+        return self._storage_paths["exports"]
     
     def get_models_path(self) -> Path:
         """Get absolute models directory path."""
-        return self.get_absolute_path(self._settings.storage.models_dir)
+        return self._storage_paths["models"]
     
     def reset_to_defaults(self) -> AppSettings:
         """Reset all settings to defaults."""
-        self._settings = AppSettings()
+        self._settings = _default_settings()
+        self._settings_changed()
         self._save_settings()
         return self._settings
+    
+    async def areset_to_defaults(self) -> AppSettings:
+        """Reset all settings to defaults from async code."""
+        async with self._get_write_lock():
+            self._settings = _default_settings()
+            self._settings_changed()
+            await self._asave_settings()
+            return self._settings
+
+
+# ============================================
+# Global Instance
+# ============================================
+
+_settings_manager: Optional[SettingsManager] = None
 
 
-# Global settings instance
 def get_settings() -> AppSettings:
     """Get the global settings instance."""
-    return SettingsManager().settings
+    return get_settings_manager().settings
 
 
 def get_settings_manager() -> SettingsManager:
     """Get the settings manager instance."""
-    return SettingsManager()
+    global _settings_manager
+    if _settings_manager is None:
+        _settings_manager = SettingsManager()
+    return _settings_manager
@@ -28,6 +28,9 @@ from .streaming import (
     create_progress_event,
     create_metadata_event,
     StreamBuffer,
+    BoundedEventQueue,
+    sse_stream,
+    loads_json,
 )
 
 from .voice_manager import (
@@ -61,6 +64,9 @@ __all__ = [
     "create_progress_event",
     "create_metadata_event",
     "StreamBuffer",
+    "BoundedEventQueue",
+    "sse_stream",
+    "loads_json",
     "VoiceManager",
     "VoiceSettings",
     "TokenChunker",
@@ -9,22 +9,40 @@ import os
 import sys
 import json
 import gc
+import copy
+import pickle
+import struct
 import shutil
+import stat as stat_module
+import queue as queue_module
 import asyncio
 import time
 import threading
 import logging
 import traceback
 import inspect
+import functools
+import importlib.util
 from pathlib import Path
-from typing import Optional, Dict, Any, List, AsyncGenerator, Callable
+from typing import Optional, Dict, Any, List, AsyncGenerator, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 
 # Disable HuggingFace cache - we control where models go
 os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
 
+# Use the parallel Rust downloader when it is installed (hub errors if enabled but missing)
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+# Grow CUDA allocations in place instead of fragmenting the cache across bnb's mixed-size
+# buffers. Read when the first CUDA allocation happens, so it must be set before that;
+# an explicit user value wins. Not supported on Windows.
+if sys.platform.startswith("linux"):
+    os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
 # ============================================
 # Flash Attention Detection (before importing transformers!)
 # ============================================
@@ -76,17 +94,23 @@ FLASH_ATTN_AVAILABLE = _check_flash_attn_works()
 if not FLASH_ATTN_AVAILABLE:
     os.environ["TRANSFORMERS_NO_FLASH_ATTN"] = "1"
 
-import torch
-from transformers import (
-    AutoConfig,
-    AutoModelForCausalLM,
-    AutoTokenizer,
-    BitsAndBytesConfig,
-    TextIteratorStreamer,
-    GenerationConfig,
-    StoppingCriteria,
-    StoppingCriteriaList,
-)
+# Optional fast JSON decoder for weight indexes - falls back to the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON bytes with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# torch, transformers and huggingface_hub are imported lazily so that importing
+# this module (CLI, settings-only paths) does not pay their multi-second startup cost.
+from . import lazy_torch as torch
 
 # ============================================
 # Colored Logging Setup
@@ -105,12 +129,23 @@ class ColoredFormatter(logging.Formatter):
     RESET = '\033[0m'
     BOLD = '\033[1m'
     
+    def __init__(self, fmt=None, datefmt=None, style='%'):
+        super().__init__(fmt, datefmt, style)
+        # Redirected output (files, pipes) gets plain lines
+        self._use_color = sys.stdout.isatty()
+        # Bake the color codes into one formatter per level instead of wrapping every record
+        self._level_formatters = {
+            level: logging.Formatter(f"{color}{self._fmt}{self.RESET}", datefmt, style)
+            for level, color in self.COLORS.items()
+        }
+    
     def format(self, record):
-        color = self.COLORS.get(record.levelname, self.RESET)
-        # Format the message
-        message = super().format(record)
-        # Add color
-        return f"{color}{message}{self.RESET}"
+        if not self._use_color:
+            return super().format(record)
+        formatter = self._level_formatters.get(record.levelname)
+        if formatter is None:
+            return f"{self.RESET}{super().format(record)}{self.RESET}"
+        return formatter.format(record)
 
 # Create logger for this module
 logger = logging.getLogger("ultrachat.models")
@@ -125,13 +160,6 @@ if not logger.handlers:
         datefmt="%H:%M:%S"
     ))
     logger.addHandler(console_handler)
-from huggingface_hub import (
-    HfApi,
-    hf_hub_download,
-    snapshot_download,
-    list_models,
-    model_info as get_model_info,
-)
 
 from ..config import get_settings_manager
 
@@ -140,7 +168,7 @@ from ..config import get_settings_manager
 # Data Classes
 # ============================================
 
-@dataclass
+@dataclass(slots=True)
 class ModelInfo:
     """Information about a HuggingFace model."""
     model_id: str
@@ -154,18 +182,27 @@ class ModelInfo:
     parameters: Optional[str] = None
     architecture: Optional[str] = None
     license: Optional[str] = None
+    _size_formatted: Optional[tuple[int, str]] = field(default=None, init=False, repr=False, compare=False)
     
     @property
     def size_formatted(self) -> str:
+        # Cached per size_bytes value (slots rule out functools.cached_property)
+        cached = self._size_formatted
+        if cached is not None and cached[0] == self.size_bytes:
+            return cached[1]
         size = self.size_bytes
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
             if size < 1024:
-                return f"{size:.1f} {unit}"
+                text = f"{size:.1f} {unit}"
+                break
             size /= 1024
-        return f"{size:.1f} PB"
+        else:
+            text = f"{size:.1f} PB"
+        self._size_formatted = (self.size_bytes, text)
+        return text
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadProgress:
     """Model download progress."""
     status: str
@@ -183,7 +220,7 @@ class DownloadProgress:
         return 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationResult:
     """Result from model generation."""
     text: str
@@ -231,11 +268,359 @@ class GPUError(ModelError):
     pass
 
 
+# ============================================
+# CUDA Capability Probes
+# ============================================
+
+@functools.lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    """Probe CUDA once; the driver state doesn't change while the process runs."""
+    return torch.cuda.is_available()
+
+
+@functools.lru_cache(maxsize=1)
+def _enable_tf32() -> None:
+    """Let residual fp32 matmuls/convs use TF32 Tensor Cores (process-wide, set once)."""
+    if _cuda_available():
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.set_float32_matmul_precision("high")
+
+
+@functools.lru_cache(maxsize=1)
+def _gpu_static_info() -> Tuple[str, int, int]:
+    """Device name, device count and total memory of GPU 0 (fixed for the process)."""
+    return (
+        torch.cuda.get_device_name(0),
+        torch.cuda.device_count(),
+        torch.cuda.get_device_properties(0).total_memory,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _compute_dtype():
+    """bfloat16 if supported, otherwise float16 (probed once)."""
+    return torch.bfloat16 if _cuda_available() and torch.cuda.is_bf16_supported() else torch.float16
+
+
+# ============================================
+# Directory Traversal
+# ============================================
+
+def _scandir_recursive(root: str):
+    """
+    Yield (DirEntry, relpath) for every file under root.
+    
+    Explicit-stack os.scandir walk: DirEntry caches the type (and stat on Windows)
+    so each file costs at most one extra syscall, and no Path objects are built.
+    """
+    stack = [(root, "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    rel_path = f"{rel_dir}{os.sep}{entry.name}" if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, rel_path))
+                    elif entry.is_file():
+                        yield entry, rel_path
+        except OSError:
+            continue
+
+
+def _dir_size_bytes(root: str) -> int:
+    """Total size of files under root, counting hardlinked files once."""
+    total = 0
+    seen_inodes = set()
+    for entry, _ in _scandir_recursive(root):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        # st_nlink is 0 from scandir on Windows, where inodes aren't reported
+        if st.st_nlink > 1:
+            inode = (st.st_dev, st.st_ino)
+            if inode in seen_inodes:
+                continue
+            seen_inodes.add(inode)
+        total += st.st_size
+    return total
+
+
+# ============================================
+# Checkpoint Size Estimation
+# ============================================
+
+def _safetensors_tensor_params(model_dir: Path) -> Dict[str, int]:
+    """
+    Parameter count per tensor name, read from safetensors headers without loading data.
+    
+    Each file starts with a little-endian u64 header length followed by a JSON
+    header listing every tensor's shape. Returns {} if any file is unreadable.
+    """
+    params: Dict[str, int] = {}
+    for path in model_dir.glob("*.safetensors"):
+        try:
+            with open(path, "rb") as f:
+                (header_len,) = struct.unpack("<Q", f.read(8))
+                header = _json_loads(f.read(header_len))
+        except (OSError, ValueError, struct.error):
+            return {}
+        for name, tensor in header.items():
+            if name == "__metadata__":
+                continue
+            count = 1
+            for dim in tensor.get("shape", ()):
+                count *= dim
+            params[name] = count
+    return params
+
+
+def _safetensors_param_count(model_dir: Path) -> int:
+    """Total parameter count from safetensors headers (0 if unknown)."""
+    return sum(_safetensors_tensor_params(model_dir).values())
+
+
+_LAYER_PREFIX = "model.layers."
+_GPU_PINNED_MODULES = ("model.embed_tokens", "model.norm", "lm_head")
+
+
+def _layer_offload_device_map(
+    model_dir: Path,
+    gpu_budget: int,
+    bytes_per_param: float,
+) -> Optional[Dict[str, Any]]:
+    """
+    Explicit GPU/CPU split for a quantized load that doesn't fit on the GPU.
+    
+    Embeddings, final norm and lm_head stay on the GPU (bnb keeps them in 16-bit),
+    then decoder layers fill the remaining budget in order and the tail goes to
+    CPU. A forward pass thus crosses PCIe once, where "auto" may also offload
+    lm_head. Only for the common model.layers.N layout; returns None otherwise.
+    """
+    params = _safetensors_tensor_params(model_dir)
+    if not params:
+        return None
+    
+    layer_params: Dict[int, int] = {}
+    pinned_params = 0
+    for name, count in params.items():
+        if name.startswith(_LAYER_PREFIX):
+            index = name[len(_LAYER_PREFIX):].split(".", 1)[0]
+            if not index.isdigit():
+                return None
+            layer_params[int(index)] = layer_params.get(int(index), 0) + count
+        elif name.startswith(_GPU_PINNED_MODULES):
+            pinned_params += count
+        else:
+            return None  # Unknown module layout: let accelerate plan it
+    if not layer_params or sorted(layer_params) != list(range(len(layer_params))):
+        return None
+    
+    device_map: Dict[str, Any] = {module: 0 for module in _GPU_PINNED_MODULES}
+    remaining = gpu_budget - pinned_params * 2
+    for index in range(len(layer_params)):
+        layer_bytes = layer_params[index] * bytes_per_param
+        if remaining >= layer_bytes:
+            device_map[f"{_LAYER_PREFIX}{index}"] = 0
+            remaining -= layer_bytes
+        else:
+            device_map[f"{_LAYER_PREFIX}{index}"] = "cpu"
+            remaining = -1  # Keep the GPU prefix contiguous
+    return device_map
+
+
+@functools.lru_cache(maxsize=256)
+def _dir_names_at(dir_path: str, mtime_ns: int) -> frozenset:
+    """Entry names of a directory; mtime_ns in the key invalidates on add/remove/rename."""
+    with os.scandir(dir_path) as it:
+        return frozenset(entry.name for entry in it)
+
+
+def _dir_names(dir_path: Path) -> Optional[frozenset]:
+    """Cached listing of a directory (one stat when unchanged), or None if it isn't one."""
+    try:
+        st = dir_path.stat()
+        if not stat_module.S_ISDIR(st.st_mode):
+            return None
+        return _dir_names_at(str(dir_path), st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _index_shard_files(index_path: str, mtime_ns: int) -> frozenset:
+    """Shard filenames listed in a weight index; mtime_ns in the key invalidates edits."""
+    data = _json_loads(Path(index_path).read_bytes())
+    return frozenset(data.get("weight_map", {}).values())
+
+
+# ============================================
+# Copy-on-Write File Cloning
+# ============================================
+
+_FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+
+@functools.lru_cache(maxsize=1)
+def _macos_clonefile():
+    """libc clonefile(2) on macOS, or None if unavailable."""
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        clonefile = libc.clonefile
+    except (OSError, AttributeError):
+        return None
+    clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    clonefile.restype = ctypes.c_int
+    return clonefile
+
+
+def _clone_file(src: str, dst: str) -> bool:
+    """
+    Clone src to dst without copying bytes where the filesystem allows it.
+    
+    Uses the FICLONE ioctl (btrfs/XFS) then copy_file_range (in-kernel copy, also
+    reflinks on newer kernels) on Linux, and clonefile on APFS. Returns False if
+    none apply, leaving dst absent so the caller can fall back to shutil.copy2.
+    """
+    if sys.platform == "darwin":
+        clonefile = _macos_clonefile()
+        return clonefile is not None and clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    
+    if not sys.platform.startswith("linux"):
+        return False
+    
+    import fcntl
+    cloned = False
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                cloned = True
+            except OSError:
+                remaining = os.fstat(src_fd).st_size
+                try:
+                    while remaining > 0:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                    cloned = remaining == 0
+                except (OSError, AttributeError):
+                    cloned = False
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    
+    if cloned:
+        shutil.copystat(src, dst)
+    else:
+        os.unlink(dst)
+    return cloned
+
+
+# ============================================
+# Local Model Registry Cache
+# ============================================
+
+_MODEL_META_FILE = ".model_meta.json"  # Quantization, size and completion time of a variant
+
+
+@functools.lru_cache(maxsize=256)
+def _model_meta_at(meta_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parsed variant metadata; mtime_ns in the key invalidates rewrites."""
+    return _json_loads(Path(meta_path).read_bytes())
+
+
+def _read_model_meta(model_dir: Path) -> Dict[str, Any]:
+    """Metadata written when a variant finished, or {} for older/partial folders."""
+    meta_path = model_dir / _MODEL_META_FILE
+    try:
+        return _model_meta_at(str(meta_path), meta_path.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return {}
+
+
+def _fsync_dir(dir_path: Path) -> None:
+    """Make new/removed directory entries durable (no-op where dirs can't be opened)."""
+    if os.name == "nt":
+        return
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _LocalModelRegistry:
+    """
+    Pickled snapshot of list_local_models(), persisted to models_dir/.registry.pkl.
+    
+    The snapshot is keyed on the mtime of every model folder, so adding, removing
+    or finishing a model (the .download_incomplete marker lives in the folder)
+    invalidates it without walking the weight files.
+    """
+    
+    FILENAME = ".registry.pkl"
+    
+    def __init__(self, models_dir: Path):
+        self._models_dir = models_dir
+        self._path = models_dir / self.FILENAME
+        self._snapshot: Optional[Tuple[tuple, List[ModelInfo]]] = None
+    
+    def fingerprint(self) -> tuple:
+        """Cheap key: (name, mtime_ns) for each top-level model folder."""
+        entries = []
+        with os.scandir(self._models_dir) as it:
+            for entry in it:
+                if entry.name != "_cache" and entry.is_dir():
+                    entries.append((entry.name, entry.stat().st_mtime_ns))
+        entries.sort()
+        return tuple(entries)
+    
+    def load(self, fingerprint: tuple) -> Optional[List[ModelInfo]]:
+        """Return the cached list if it was stored under the same fingerprint."""
+        if self._snapshot is None:
+            try:
+                self._snapshot = pickle.loads(self._path.read_bytes())
+            except Exception:
+                # Missing, truncated or written by an incompatible version
+                return None
+        stored_fingerprint, models = self._snapshot
+        if stored_fingerprint != fingerprint:
+            return None
+        return models
+    
+    def store(self, fingerprint: tuple, models: List[ModelInfo]) -> None:
+        """Remember the list in memory and on disk (best effort)."""
+        self._snapshot = (fingerprint, models)
+        tmp_path = self._path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(pickle.dumps(self._snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.debug(f"Could not persist model registry cache: {e}")
+    
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next listing rescans the folders."""
+        self._snapshot = None
+        try:
+            self._path.unlink()
+        except OSError:
+            pass
+
+
 # ============================================
 # Quantization Configs
 # ============================================
 
-def get_quantization_config(quant_type: str, allow_cpu_offload: bool = True) -> Optional[BitsAndBytesConfig]:
+def get_quantization_config(quant_type: str, allow_cpu_offload: bool = True) -> Optional["BitsAndBytesConfig"]:
     """
     Get BitsAndBytes quantization config.
     
@@ -243,8 +628,9 @@ def get_quantization_config(quant_type: str, allow_cpu_offload: bool = True) ->
         quant_type: "4bit", "8bit", "fp16", "fp32", or None
         allow_cpu_offload: If True, enables CPU offload for when GPU memory is insufficient
     """
-    # Determine compute dtype (bfloat16 if supported, otherwise float16)
-    compute_dtype = torch.bfloat16 if torch.cuda.is_available() and torch.cuda.is_bf16_supported() else torch.float16
+    from transformers import BitsAndBytesConfig
+    
+    compute_dtype = _compute_dtype()
     
     if quant_type == "4bit":
         return BitsAndBytesConfig(
@@ -285,6 +671,13 @@ def normalize_quantization(quant_type: Optional[str]) -> Optional[str]:
 # Model Manager
 # ============================================
 
+# Streamed tokens cross into the event loop in batches: one wakeup per flush, not per token
+_STREAM_FLUSH_TOKENS = 8
+_STREAM_FLUSH_INTERVAL = 0.01  # Seconds; a batch older than this flushes with the next token
+_STOP_CHECK_INTERVAL = 8  # Decode steps between stop-request polls
+_STATIC_CACHE_MIN_LEN = 4096  # Smallest static KV cache; larger ones grow by powers of two
+_POPULAR_MODELS_TTL = 600.0  # Seconds to reuse the Hub's popular-models listing
+
 class HFModelManager:
     """
     Manages HuggingFace models with:
@@ -295,18 +688,29 @@ class HFModelManager:
     """
     
     _instance: Optional['HFModelManager'] = None
+    _lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialized = False
+                    cls._instance = instance
         return cls._instance
     
     def __init__(self):
         if self._initialized:
             return
-            
-        self._initialized = True
+        with self._lock:
+            # Another thread may have finished initializing while we waited
+            if self._initialized:
+                return
+            self._init_state()
+            self._initialized = True
+    
+    def _init_state(self):
+        """Set up instance state (runs once, under the class lock)."""
         self._models_dir: Optional[Path] = None
         self._loaded_model: Optional[Any] = None
         self._loaded_tokenizer: Optional[Any] = None
@@ -318,18 +722,59 @@ class HFModelManager:
         self._loaded_assistant_tokenizer: Optional[Any] = None
         self._loaded_assistant_model_id: Optional[str] = None
         self._loaded_assistant_quantization: Optional[str] = None
+        self._use_static_cache = False  # Per loaded model (model.use_static_cache setting)
+        self._static_kv_cache: Optional[Any] = None  # Reused across requests (see _static_cache_for)
+        self._static_kv_cache_len = 0
+        self._base_gen_config: Optional[Any] = None  # GenerationConfig defaults for the loaded model
         
-        self._hf_api = HfApi()
-        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._hf_api = None  # Created on first use (see hf_api)
+        self._executor = ThreadPoolExecutor(max_workers=2)  # Model load
+        # Hub queries and downloads get their own pools so neither waits behind the other
+        self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hf-io")
+        self._dl_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hf-dl")
         self._generation_lock = threading.Lock()
+        self._popular_models: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}  # limit -> (fetched_at, models)
+        self._popular_models_lock = asyncio.Lock()
         self._stop_event = threading.Event()
         self._kv_cache: Dict[str, KVCacheEntry] = {}
         self._kv_cache_lock = threading.Lock()
         self._kv_cache_max_entries = 8
         self._max_prompt_length = 4096
         
+        # Generation runs on one long-lived thread (and its own CUDA stream, see _generation_loop)
+        self._gen_jobs: "queue_module.Queue[Tuple[Callable[[], Any], Future]]" = queue_module.Queue()
+        self._gen_stream = None
+        threading.Thread(target=self._generation_loop, name="hf-generate", daemon=True).start()
+        
         self._init_paths()
     
+    def _generation_loop(self):
+        """Run submitted generation jobs one at a time, on a dedicated CUDA stream when available."""
+        while True:
+            fn, future = self._gen_jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                stream_ctx = nullcontext()
+                if _cuda_available():
+                    if self._gen_stream is None:
+                        self._gen_stream = torch.cuda.Stream()
+                    # Weights are copied in on the default stream by the loader; order after them
+                    self._gen_stream.wait_stream(torch.cuda.default_stream())
+                    stream_ctx = torch.cuda.stream(self._gen_stream)
+                with stream_ctx:
+                    result = fn()
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+    
+    def _submit_generation(self, fn: Callable[[], Any]) -> Future:
+        """Queue fn on the generation thread."""
+        future: Future = Future()
+        self._gen_jobs.put((fn, future))
+        return future
+    
     def _init_paths(self):
         """Initialize model storage paths."""
         settings = get_settings_manager()
@@ -339,6 +784,16 @@ class HFModelManager:
         # Cache directory for raw HuggingFace downloads
         self._cache_dir = self._models_dir / "_cache"
         self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._registry = _LocalModelRegistry(self._models_dir)
+        self._list_cache: Dict[str, tuple[int, Optional[ModelInfo]]] = {}
+    
+    @property
+    def hf_api(self):
+        """HuggingFace Hub API client (imported on first use)."""
+        if self._hf_api is None:
+            from huggingface_hub import HfApi
+            self._hf_api = HfApi()
+        return self._hf_api
     
     @property
     def models_dir(self) -> Path:
@@ -353,24 +808,25 @@ class HFModelManager:
     @property
     def device(self) -> str:
         """Get the best available device."""
-        if torch.cuda.is_available():
+        if _cuda_available():
             return "cuda"
         return "cpu"
     
     @property
     def gpu_info(self) -> Dict[str, Any]:
         """Get GPU information."""
-        if not torch.cuda.is_available():
+        if not _cuda_available():
             return {"available": False}
         
+        device_name, device_count, memory_total = _gpu_static_info()
         return {
             "available": True,
-            "device_name": torch.cuda.get_device_name(0),
-            "device_count": torch.cuda.device_count(),
-            "memory_total": torch.cuda.get_device_properties(0).total_memory,
+            "device_name": device_name,
+            "device_count": device_count,
+            "memory_total": memory_total,
             "memory_allocated": torch.cuda.memory_allocated(0),
             "memory_cached": torch.cuda.memory_reserved(0),
-            "memory_free": torch.cuda.get_device_properties(0).total_memory - torch.cuda.memory_allocated(0),
+            "memory_free": torch.cuda.mem_get_info(0)[0],
         }
     
     def _get_model_local_path(self, model_id: str, quantization: Optional[str] = None) -> Path:
@@ -394,68 +850,108 @@ class HFModelManager:
         - *.safetensors files OR
         - *.bin files (pytorch_model.bin)
         """
-        if not model_dir.exists() or not model_dir.is_dir():
+        names = _dir_names(model_dir)
+        if names is None:
             return False
         
         # Ignore incomplete downloads
-        if (model_dir / ".download_incomplete").exists():
+        if ".download_incomplete" in names:
             return False
         
         # Check for essential model files
-        has_config = (model_dir / "config.json").exists()
-        has_tokenizer = (model_dir / "tokenizer.json").exists() or (model_dir / "tokenizer_config.json").exists()
-        has_weights = self._has_complete_weights(model_dir)
+        has_config = "config.json" in names
+        has_tokenizer = "tokenizer.json" in names or "tokenizer_config.json" in names
+        has_weights = self._has_complete_weights(model_dir, names)
         
         # Valid if has config AND weights AND tokenizer
         return has_config and has_weights and has_tokenizer
     
     def _get_quantization_from_marker(self, model_dir: Path) -> Optional[str]:
         """Check if model dir has a quantization marker file and return the quantization type."""
+        names = _dir_names(model_dir) or frozenset()
+        if _MODEL_META_FILE in names:
+            quant = _read_model_meta(model_dir).get("quantization")
+            return quant if quant in ("4bit", "8bit") else None
+        # Folders created before .model_meta.json used one marker file per level
         for quant in ("4bit", "8bit"):
-            marker = model_dir / f".quantization_{quant}"
-            if marker.exists():
+            if f".quantization_{quant}" in names:
                 return quant
         return None
     
-    def _has_complete_weights(self, model_dir: Path) -> bool:
+    def _finalize_variant(self, output_path: Path, quantization: Optional[str]) -> None:
+        """Write the variant's metadata, clear its incomplete marker and flush both to disk."""
+        meta = {
+            "quantization": quantization,
+            "size_bytes": _dir_size_bytes(str(output_path)),
+            "completed_at": datetime.now().isoformat(),
+        }
+        with open(output_path / _MODEL_META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        (output_path / ".download_incomplete").unlink(missing_ok=True)
+        # One directory fsync covers the new metadata entry, the marker removal and the saved weights' names
+        _fsync_dir(output_path)
+    
+    def _has_complete_weights(self, model_dir: Path, names: Optional[frozenset] = None) -> bool:
         """Check if model directory has complete weight files (all shards if indexed)."""
+        if names is None:
+            names = _dir_names(model_dir) or frozenset()
         index_files = [
             "model.safetensors.index.json",
             "pytorch_model.bin.index.json",
         ]
         for index_name in index_files:
+            if index_name not in names:
+                continue
             index_path = model_dir / index_name
-            if index_path.exists():
-                try:
-                    data = json.loads(index_path.read_text(encoding="utf-8"))
-                    weight_map = data.get("weight_map", {})
-                    if not weight_map:
-                        return False
-                    required_files = set(weight_map.values())
-                    for filename in required_files:
-                        if not (model_dir / filename).exists():
-                            return False
-                    return True
-                except Exception:
+            try:
+                required_files = _index_shard_files(str(index_path), index_path.stat().st_mtime_ns)
+                if not required_files:
                     return False
+                for filename in required_files:
+                    # Shards normally sit next to the index; only nested paths need a stat
+                    if filename not in names and not (model_dir / filename).exists():
+                        return False
+                return True
+            except Exception:
+                return False
         
         # Fallback: single-file models
-        has_safetensors = any(model_dir.glob("*.safetensors"))
-        has_bin = any(model_dir.glob("*.bin"))
-        return has_safetensors or has_bin
-    
-    def _collect_model_files(self, src_dir: Path) -> List[tuple[Path, Path, int]]:
-        """Collect all files from a model directory with sizes."""
-        files: List[tuple[Path, Path, int]] = []
-        for root, _, filenames in os.walk(src_dir):
-            for filename in filenames:
-                src_file = Path(root) / filename
-                rel_path = src_file.relative_to(src_dir)
-                try:
-                    size = src_file.stat().st_size
-                except OSError:
-                    size = 0
-                files.append((src_file, rel_path, size))
+        return any(name.endswith((".safetensors", ".bin")) for name in names)
+    
+    def _download_ignore_patterns(self, model_id: str) -> List[str]:
+        """
+        Patterns for snapshot_download to skip redundant weight formats.
+        
+        Flax/TF/Rust weights are never used. PyTorch pickles are skipped when the
+        repo's root-level HF weights are also in safetensors, roughly halving the
+        bytes fetched. Other .safetensors files (adapters, consolidated or original/
+        checkpoints) don't count, since transformers won't load the model from them.
+        """
+        patterns = ["*.msgpack", "*.h5", "*.ot"]
+        try:
+            repo_files = self.hf_api.list_repo_files(model_id)
+        except Exception as e:
+            logger.debug(f"Could not list repo files for {model_id}: {e}")
+            return patterns
+        if any(
+            name == "model.safetensors.index.json"
+            or (name.startswith("model") and name.endswith(".safetensors") and "/" not in name)
+            for name in repo_files
+        ):
+            patterns.extend(["*.bin", "*.bin.index.json", "*.pt", "*.pth"])
+        return patterns
+    
+    def _collect_model_files(self, src_dir: Path) -> List[tuple[str, str, int]]:
+        """Collect (src_path, rel_path, size) for all files in a model directory, as plain strings."""
+        files: List[tuple[str, str, int]] = []
+        for entry, rel_path in _scandir_recursive(str(src_dir)):
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                size = 0
+            files.append((entry.path, rel_path, size))
         return files
     
     def _link_or_copy_model_files(
@@ -472,24 +968,51 @@ class HFModelManager:
         files = self._collect_model_files(src_dir)
         total_bytes = sum(size for _, _, size in files)
         completed_bytes = 0
+        # Report at most every 50MB or 100ms (and always for the last file)
+        last_report_bytes = 0
+        last_report_ts = time.monotonic()
+        last_index = len(files) - 1
+        
+        dest_root = str(dest_dir)
+        made_dirs = set()
         
-        for src_file, rel_path, size in files:
-            dest_file = dest_dir / rel_path
-            dest_file.parent.mkdir(parents=True, exist_ok=True)
+        for index, (src_file, rel_path, size) in enumerate(files):
+            dest_file = os.path.join(dest_root, rel_path)
+            dest_parent = os.path.dirname(dest_file)
+            if dest_parent not in made_dirs:
+                os.makedirs(dest_parent, exist_ok=True)
+                made_dirs.add(dest_parent)
             
             try:
-                if dest_file.exists():
-                    dest_file.unlink()
+                try:
+                    os.unlink(dest_file)
+                except FileNotFoundError:
+                    pass
                 os.link(src_file, dest_file)
             except Exception:
-                shutil.copy2(src_file, dest_file)
+                # Cross-device or no hardlink support: try a CoW clone before a byte copy
+                try:
+                    cloned = _clone_file(src_file, dest_file)
+                except OSError:
+                    cloned = False
+                if not cloned:
+                    shutil.copy2(src_file, dest_file)
             
             completed_bytes += size
-            if progress_callback:
+            if not progress_callback:
+                continue
+            now = time.monotonic()
+            if (
+                index == last_index
+                or completed_bytes - last_report_bytes >= 50 * 1024 * 1024
+                or now - last_report_ts >= 0.1
+            ):
+                last_report_bytes = completed_bytes
+                last_report_ts = now
                 progress_callback(DownloadProgress(
                     status=status,
                     model_id=model_id,
-                    current_file=str(rel_path),
+                    current_file=rel_path,
                     completed_bytes=completed_bytes,
                     total_bytes=total_bytes,
                     files_completed=files_completed,
@@ -508,6 +1031,8 @@ class HFModelManager:
     ) -> List[Dict[str, Any]]:
         """Search HuggingFace for models."""
         def _search():
+            from huggingface_hub import list_models
+            
             models = list_models(
                 search=query,
                 task=task,
@@ -528,12 +1053,14 @@ class HFModelManager:
                 })
             return results
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _search)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, _search)
     
     async def get_model_info(self, model_id: str) -> Dict[str, Any]:
         """Get detailed info about a HuggingFace model."""
         def _get_info():
+            from huggingface_hub import model_info as get_model_info
+            
             try:
                 info = get_model_info(model_id)
                 return {
@@ -556,12 +1083,26 @@ class HFModelManager:
             except Exception as e:
                 raise ModelNotFoundError(f"Model not found: {model_id}") from e
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _get_info)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, _get_info)
     
     async def get_popular_models(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """Get popular text generation models."""
-        return await self.search_models("", task="text-generation", limit=limit)
+        """
+        Get popular text generation models.
+        
+        The listing is reused for _POPULAR_MODELS_TTL seconds, and concurrent callers
+        wait on one in-flight Hub query instead of each sending their own.
+        """
+        cached = self._popular_models.get(limit)
+        if cached is not None and time.monotonic() - cached[0] < _POPULAR_MODELS_TTL:
+            return cached[1]
+        async with self._popular_models_lock:
+            cached = self._popular_models.get(limit)
+            if cached is not None and time.monotonic() - cached[0] < _POPULAR_MODELS_TTL:
+                return cached[1]
+            models = await self.search_models("", task="text-generation", limit=limit)
+            self._popular_models[limit] = (time.monotonic(), models)
+            return models
     
     # ============================================
     # Model Download with Multi-Quantization Support
@@ -602,6 +1143,9 @@ class HFModelManager:
         output_paths = []
         
         def _download_and_quantize():
+            from huggingface_hub import snapshot_download
+            from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+            
             nonlocal output_paths
             
             # Step 1: Download raw model to cache
@@ -611,13 +1155,36 @@ class HFModelManager:
                     model_id=model_id,
                 ))
             
-            # Check if already in cache
-            if not cache_path.exists() or not any(cache_path.iterdir()):
-                # Download to cache directory
+            # Check if already in cache: stray files (.lock, a lone config) or a partial
+            # shard set don't count, snapshot_download resumes and skips finished files
+            if not self._has_complete_weights(cache_path):
+                download_kwargs = {}
+                if progress_callback:
+                    from huggingface_hub.utils import tqdm as hf_tqdm
+                    
+                    class _ProgressTqdm(hf_tqdm):
+                        """Forwards snapshot_download's per-file bar to progress_callback."""
+                        def update(self, n=1):
+                            result = super().update(n)
+                            progress_callback(DownloadProgress(
+                                status="downloading",
+                                model_id=model_id,
+                                files_completed=self.n,
+                                files_total=self.total or 0,
+                            ))
+                            return result
+                    
+                    download_kwargs["tqdm_class"] = _ProgressTqdm
+                
+                # Download to cache directory (shards fetched in parallel)
                 snapshot_download(
                     repo_id=model_id,
                     local_dir=str(cache_path),
                     local_dir_use_symlinks=False,
+                    max_workers=8,
+                    etag_timeout=30,
+                    ignore_patterns=self._download_ignore_patterns(model_id),
+                    **download_kwargs,
                 )
             else:
                 if progress_callback:
@@ -626,250 +1193,351 @@ class HFModelManager:
                         model_id=model_id,
                     ))
             
-            # Step 2: Create each quantized version
-            for idx, quant in enumerate(quantizations):
-                quant_label = quant if quant else "fp32"
-                
-                if progress_callback:
-                    progress_callback(DownloadProgress(
-                        status=f"quantizing_{quant_label}",
-                        model_id=model_id,
-                        files_completed=idx,
-                        files_total=len(quantizations),
-                    ))
-                
-                output_path = self._get_model_local_path(model_id, quant)
-                
-                # Skip if already exists and is valid
-                if output_path.exists() and self._is_valid_model_dir(output_path):
-                    logger.info(f"✅ {quant_label} version already exists, skipping...")
-                    output_paths.append(output_path)
-                    continue
-                
-                # Clean up any incomplete previous attempts
-                if output_path.exists():
-                    shutil.rmtree(output_path)
-                
-                output_path.mkdir(parents=True, exist_ok=True)
-                incomplete_marker = output_path / ".download_incomplete"
-                incomplete_marker.write_text(
-                    f"Incomplete download for {model_id} ({quant_label})\n"
-                    f"Started: {datetime.now().isoformat()}"
-                )
-                
-                # For 4bit/8bit: Load with quantization and save as a separate model
-                if quant in ("4bit", "8bit"):
-                    model = None  # Track for cleanup
-                    tokenizer = None
-                    try:
-                        logger.info(f"📦 Loading tokenizer from cache for {quant_label}...")
-                        if progress_callback:
-                            progress_callback(DownloadProgress(
-                                status=f"loading_tokenizer_{quant_label}",
-                                model_id=model_id,
-                                files_completed=idx,
-                                files_total=len(quantizations),
-                            ))
-                        tokenizer = AutoTokenizer.from_pretrained(
-                            str(cache_path),
-                            trust_remote_code=True,
-                        )
-                        # Set pad token if not set
-                        if tokenizer.pad_token_id is None:
-                            tokenizer.pad_token = tokenizer.eos_token
-                        
-                        logger.info(f"🔧 Loading model with {quant_label} quantization (this may take several minutes)...")
-                        logger.info(f"   Using NF4 quantization with double quant and CPU offload enabled...")
-                        if progress_callback:
-                            progress_callback(DownloadProgress(
-                                status=f"quantizing_{quant_label}",
-                                model_id=model_id,
-                                files_completed=idx,
-                                files_total=len(quantizations),
-                            ))
-                        
-                        logger.debug(f"   📥 Loading checkpoint shards...")
-                        
-                        # Calculate max memory to use - leave 1GB buffer on GPU
-                        max_memory = None
-                        if torch.cuda.is_available():
-                            gpu_mem = torch.cuda.get_device_properties(0).total_memory
-                            gpu_available = gpu_mem - torch.cuda.memory_allocated(0)
-                            # Use 90% of available GPU memory, rest on CPU
-                            gpu_use = int(gpu_available * 0.9)
-                            max_memory = {0: gpu_use, "cpu": "32GB"}
-                            logger.info(f"   📊 GPU memory limit: {gpu_use / 1024**3:.1f}GB")
-                        
-                        def is_oom_error(error: Exception) -> bool:
-                            """Check if error is out of memory."""
-                            msg = str(error).lower()
-                            return "out of memory" in msg or ("cuda" in msg and "memory" in msg)
-                        
-                        # Try GPU-only first (like Qwen LoRa pattern), fallback to auto if OOM
+            # Load straight from mmapped safetensors when the cache has them
+            use_safetensors = True if any(cache_path.glob("*.safetensors")) else None
+            
+            # Step 2: Create each quantized version. The fp32 variant is only a disk
+            # link/copy, so it goes first and runs on a worker while the GPU variants build.
+            paths_by_idx: Dict[int, Path] = {}
+            fp32_job = None
+            fp32_idx = 0
+            build_order = sorted(enumerate(quantizations), key=lambda item: item[1] is not None)
+            try:
+                for idx, quant in build_order:
+                    quant_label = quant if quant else "fp32"
+                    
+                    if progress_callback:
+                        progress_callback(DownloadProgress(
+                            status=f"quantizing_{quant_label}",
+                            model_id=model_id,
+                            files_completed=idx,
+                            files_total=len(quantizations),
+                        ))
+                    
+                    output_path = self._get_model_local_path(model_id, quant)
+                    
+                    # Skip if already exists and is valid
+                    if output_path.exists() and self._is_valid_model_dir(output_path):
+                        logger.info(f"✅ {quant_label} version already exists, skipping...")
+                        paths_by_idx[idx] = output_path
+                        continue
+                    
+                    # Clean up any incomplete previous attempts
+                    if output_path.exists():
+                        shutil.rmtree(output_path)
+                    
+                    output_path.mkdir(parents=True, exist_ok=True)
+                    incomplete_marker = output_path / ".download_incomplete"
+                    incomplete_marker.write_text(
+                        f"Incomplete download for {model_id} ({quant_label})\n"
+                        f"Started: {datetime.now().isoformat()}"
+                    )
+                    
+                    # For 4bit/8bit: Load with quantization and save as a separate model
+                    if quant in ("4bit", "8bit"):
+                        model = None  # Track for cleanup
+                        tokenizer = None
                         try:
-                            logger.info(f"   🎯 Attempting GPU-only load for quantization...")
-                            quant_config = get_quantization_config(quant, allow_cpu_offload=False)
-                            model = AutoModelForCausalLM.from_pretrained(
+                            # Parse config.json once for tokenizer and model; everything is local now
+                            config = AutoConfig.from_pretrained(
+                                str(cache_path), trust_remote_code=True, local_files_only=True
+                            )
+                            
+                            logger.info(f"📦 Loading tokenizer from cache for {quant_label}...")
+                            if progress_callback:
+                                progress_callback(DownloadProgress(
+                                    status=f"loading_tokenizer_{quant_label}",
+                                    model_id=model_id,
+                                    files_completed=idx,
+                                    files_total=len(quantizations),
+                                ))
+                            tokenizer = AutoTokenizer.from_pretrained(
                                 str(cache_path),
-                                quantization_config=quant_config,
-                                torch_dtype="auto",
-                                device_map={"": 0},  # GPU-only, no meta tensors
                                 trust_remote_code=True,
-                                low_cpu_mem_usage=True,
+                                config=config,
+                                local_files_only=True,
                             )
-                        except (RuntimeError, ValueError) as e:
-                            if is_oom_error(e):
-                                logger.warning(f"   ⚠️ GPU-only load failed (OOM). Falling back to CPU offload...")
+                            # Set pad token if not set
+                            if tokenizer.pad_token_id is None:
+                                tokenizer.pad_token = tokenizer.eos_token
+                            
+                            logger.info(f"🔧 Loading model with {quant_label} quantization (this may take several minutes)...")
+                            logger.info(f"   Using NF4 quantization with double quant and CPU offload enabled...")
+                            if progress_callback:
+                                progress_callback(DownloadProgress(
+                                    status=f"quantizing_{quant_label}",
+                                    model_id=model_id,
+                                    files_completed=idx,
+                                    files_total=len(quantizations),
+                                ))
+                            
+                            logger.debug(f"   📥 Loading checkpoint shards...")
+                            
+                            # Calculate max memory to use - leave headroom on GPU
+                            max_memory = None
+                            gpu_available = None
+                            if _cuda_available():
+                                # Driver-reported free memory also accounts for other processes
+                                # and the CUDA context, which memory_allocated() can't see
+                                gpu_available, _ = torch.cuda.mem_get_info(0)
+                                # Blocks cached by our own allocator (e.g. after an unload) are reusable too
+                                gpu_available += torch.cuda.memory_reserved(0) - torch.cuda.memory_allocated(0)
+                                # Use 85% of free GPU memory, keeping at least 1.5GB spare; rest on CPU
+                                gpu_use = int(max(0, min(gpu_available * 0.85, gpu_available - 1.5 * 1024**3)))
+                                max_memory = {0: gpu_use, "cpu": "32GB"}
+                                logger.info(f"   📊 GPU memory limit: {gpu_use / 1024**3:.1f}GB")
+                            
+                            def is_oom_error(error: Exception) -> bool:
+                                """Check if error is out of memory."""
+                                msg = str(error).lower()
+                                return "out of memory" in msg or ("cuda" in msg and "memory" in msg)
+                            
+                            # Pre-flight: skip a GPU-only attempt that can't fit (it would load every shard, then OOM)
+                            try_gpu_only = True
+                            if gpu_available is not None:
+                                param_count = _safetensors_param_count(cache_path)
+                                if param_count:
+                                    bytes_per_param = 0.5 if quant == "4bit" else 1.0
+                                    needed = param_count * bytes_per_param + 1024**3
+                                    if needed > gpu_available:
+                                        try_gpu_only = False
+                                        logger.info(
+                                            f"   📏 ~{needed / 1024**3:.1f}GB needed > {gpu_available / 1024**3:.1f}GB free, "
+                                            f"loading with CPU offload directly..."
+                                        )
+                            
+                            # Try GPU-only first (like Qwen LoRa pattern), fallback to auto if OOM
+                            if try_gpu_only:
+                                try:
+                                    logger.info(f"   🎯 Attempting GPU-only load for quantization...")
+                                    quant_config = get_quantization_config(quant, allow_cpu_offload=False)
+                                    model = AutoModelForCausalLM.from_pretrained(
+                                        str(cache_path),
+                                        quantization_config=quant_config,
+                                        torch_dtype=_compute_dtype(),  # Non-quantized modules match bnb compute dtype
+                                        device_map={"": 0},  # GPU-only, no meta tensors
+                                        trust_remote_code=True,
+                                        config=config,
+                                        local_files_only=True,
+                                        low_cpu_mem_usage=True,
+                                        use_safetensors=use_safetensors,
+                                    )
+                                except (RuntimeError, ValueError) as e:
+                                    if not is_oom_error(e):
+                                        raise
+                                    logger.warning(f"   ⚠️ GPU-only load failed (OOM). Falling back to CPU offload...")
+                                    model = None
+                            
+                            if model is None:
+                                # Retry outside the except block so the failed attempt's traceback
+                                # (and the partial model its frames reference) is released first
                                 gc.collect()
-                                if torch.cuda.is_available():
+                                if _cuda_available():
                                     torch.cuda.empty_cache()
                                 
+                                offload_kwargs = {"device_map": "auto", "max_memory": max_memory}
+                                if max_memory is not None:
+                                    layer_map = _layer_offload_device_map(
+                                        cache_path,
+                                        max_memory[0],
+                                        0.5 if quant == "4bit" else 1.0,
+                                    )
+                                    if layer_map is not None:
+                                        gpu_layers = sum(
+                                            1 for module, device in layer_map.items()
+                                            if module.startswith(_LAYER_PREFIX) and device == 0
+                                        )
+                                        logger.info(f"   🧩 Keeping embeddings, lm_head and {gpu_layers} decoder layers on GPU")
+                                        offload_kwargs = {"device_map": layer_map}
+                                
                                 quant_config = get_quantization_config(quant, allow_cpu_offload=True)
                                 model = AutoModelForCausalLM.from_pretrained(
                                     str(cache_path),
                                     quantization_config=quant_config,
-                                    torch_dtype="auto",
-                                    device_map="auto",
-                                    max_memory=max_memory,
+                                    torch_dtype=_compute_dtype(),
+                                    **offload_kwargs,
                                     trust_remote_code=True,
+                                    config=config,
+                                    local_files_only=True,
                                     low_cpu_mem_usage=True,
+                                    use_safetensors=use_safetensors,
                                 )
-                            else:
-                                raise
+                            
+                            logger.debug(f"   ✅ Checkpoint shards loaded, model object created!")
+                            
+                            logger.info(f"✅ Model loaded and quantized!")
+                            # Display memory usage
+                            if _cuda_available():
+                                allocated = torch.cuda.memory_allocated() / 1024**3
+                                logger.info(f"   💾 GPU memory used: {allocated:.2f} GB")
+                            
+                            logger.info(f"💾 Saving {quant_label} model to disk (this may take a while for large models)...")
+                            if progress_callback:
+                                progress_callback(DownloadProgress(
+                                    status=f"saving_{quant_label}",
+                                    model_id=model_id,
+                                    files_completed=idx,
+                                    files_total=len(quantizations),
+                                ))
+                            
+                            # Tokenizer files are written on a worker while the model shards save
+                            tokenizer_saved = self._io_executor.submit(tokenizer.save_pretrained, str(output_path))
+                            try:
+                                try:
+                                    model.save_pretrained(
+                                        str(output_path), safe_serialization=True, max_shard_size="5GB"
+                                    )
+                                    logger.info(f"✅ {quant_label} model saved successfully!")
+                                except Exception as save_error:
+                                    error_str = str(save_error).lower()
+                                    if "meta" in error_str or "item" in error_str:
+                                        logger.warning(f"   ⚠️ Safe serialization failed (meta tensors), trying without safe_serialization...")
+                                        # Try without safe serialization (uses pickle instead of safetensors)
+                                        model.save_pretrained(
+                                            str(output_path), safe_serialization=False, max_shard_size="5GB"
+                                        )
+                                        logger.info(f"✅ {quant_label} model saved (pickle format)!")
+                                    else:
+                                        raise save_error
+                            finally:
+                                # Never leave the tokenizer writing into a variant the error path cleans up
+                                wait([tokenizer_saved])
+                            tokenizer_saved.result()
+                            
+                            # Metadata tells the loader the quantization level and marks the download complete
+                            self._finalize_variant(output_path, quant)
+                            
+                            logger.info(f"✅ {quant_label} model saved to {output_path}")
+                            paths_by_idx[idx] = output_path
+                            
+                        except Exception as quant_error:
+                            logger.error(f"❌ Failed to quantize model: {quant_error}")
+                            logger.error(traceback.format_exc())
+                            raise QuantizationError(f"Failed to create {quant_label} version: {quant_error}")
+                        finally:
+                            # ALWAYS cleanup model from GPU on error or success
+                            if model is not None:
+                                del model
+                            if tokenizer is not None:
+                                del tokenizer
+                            gc.collect()
+                            if _cuda_available():
+                                torch.cuda.empty_cache()
+                                allocated = torch.cuda.memory_allocated() / 1024**3
+                                logger.debug(f"   🧹 GPU memory after cleanup: {allocated:.2f} GB")
+                        
+                    elif quant == "fp16":
+                        # "fp16" names the half-precision variant; bf16 keeps fp32's exponent range
+                        half_dtype = _compute_dtype()
+                        logger.info(f"📦 Converting to half precision ({half_dtype})...")
+                        if progress_callback:
+                            progress_callback(DownloadProgress(
+                                status="converting_fp16",
+                                model_id=model_id,
+                                files_completed=idx,
+                                files_total=len(quantizations),
+                            ))
                         
-                        logger.debug(f"   ✅ Checkpoint shards loaded, model object created!")
+                        config = AutoConfig.from_pretrained(
+                            str(cache_path), trust_remote_code=True, local_files_only=True
+                        )
                         
-                        logger.info(f"✅ Model loaded and quantized!")
-                        # Display memory usage
-                        if torch.cuda.is_available():
-                            allocated = torch.cuda.memory_allocated() / 1024**3
-                            logger.info(f"   💾 GPU memory used: {allocated:.2f} GB")
+                        # Load tokenizer
+                        tokenizer = AutoTokenizer.from_pretrained(
+                            str(cache_path),
+                            trust_remote_code=True,
+                            config=config,
+                            local_files_only=True,
+                        )
+                        
+                        # Load model in fp16
+                        model = AutoModelForCausalLM.from_pretrained(
+                            str(cache_path),
+                            torch_dtype=half_dtype,
+                            device_map="cpu",  # Load to CPU for saving
+                            trust_remote_code=True,
+                            config=config,
+                            local_files_only=True,
+                            low_cpu_mem_usage=True,
+                            use_safetensors=use_safetensors,
+                        )
                         
-                        logger.info(f"💾 Saving {quant_label} model to disk (this may take a while for large models)...")
+                        logger.info(f"💾 Saving FP16 version...")
                         if progress_callback:
                             progress_callback(DownloadProgress(
-                                status=f"saving_{quant_label}",
+                                status="saving_fp16",
                                 model_id=model_id,
                                 files_completed=idx,
                                 files_total=len(quantizations),
                             ))
-                        
+                        tokenizer_saved = self._io_executor.submit(tokenizer.save_pretrained, str(output_path))
                         try:
-                            model.save_pretrained(str(output_path), safe_serialization=True)
-                            tokenizer.save_pretrained(str(output_path))
-                            logger.info(f"✅ {quant_label} model saved successfully!")
-                        except Exception as save_error:
-                            error_str = str(save_error).lower()
-                            if "meta" in error_str or "item" in error_str:
-                                logger.warning(f"   ⚠️ Safe serialization failed (meta tensors), trying without safe_serialization...")
-                                # Try without safe serialization (uses pickle instead of safetensors)
-                                model.save_pretrained(str(output_path), safe_serialization=False)
-                                tokenizer.save_pretrained(str(output_path))
-                                logger.info(f"✅ {quant_label} model saved (pickle format)!")
-                            else:
-                                raise save_error
-                        
-                        # Create a marker file that tells the loader the quantization level
-                        marker_file = output_path / f".quantization_{quant}"
-                        marker_file.write_text(f"Quantized: {quant}\nCreated: {datetime.now().isoformat()}")
+                            model.save_pretrained(
+                                str(output_path), safe_serialization=True, max_shard_size="5GB"
+                            )
+                        finally:
+                            wait([tokenizer_saved])
+                        tokenizer_saved.result()
                         
                         # Mark download as complete
-                        (output_path / ".download_complete").write_text(
-                            f"Completed: {datetime.now().isoformat()}"
-                        )
-                        incomplete_marker.unlink(missing_ok=True)
+                        self._finalize_variant(output_path, quant)
                         
-                        logger.info(f"✅ {quant_label} model saved to {output_path}")
-                        output_paths.append(output_path)
+                        logger.info(f"✅ FP16 version saved to {output_path}")
                         
-                    except Exception as quant_error:
-                        logger.error(f"❌ Failed to quantize model: {quant_error}")
-                        logger.error(traceback.format_exc())
-                        raise QuantizationError(f"Failed to create {quant_label} version: {quant_error}")
-                    finally:
-                        # ALWAYS cleanup model from GPU on error or success
-                        if model is not None:
-                            del model
-                        if tokenizer is not None:
-                            del tokenizer
+                        # Free memory
+                        del model
+                        del tokenizer
                         gc.collect()
-                        if torch.cuda.is_available():
-                            torch.cuda.empty_cache()
-                            allocated = torch.cuda.memory_allocated() / 1024**3
-                            logger.debug(f"   🧹 GPU memory after cleanup: {allocated:.2f} GB")
-                    
-                elif quant == "fp16":
-                    logger.info(f"📦 Converting to FP16 (half precision)...")
-                    if progress_callback:
-                        progress_callback(DownloadProgress(
-                            status="converting_fp16",
-                            model_id=model_id,
-                            files_completed=idx,
-                            files_total=len(quantizations),
-                        ))
-                    
-                    # Load tokenizer
-                    tokenizer = AutoTokenizer.from_pretrained(
-                        str(cache_path),
-                        trust_remote_code=True,
-                    )
-                    
-                    # Load model in fp16
-                    model = AutoModelForCausalLM.from_pretrained(
-                        str(cache_path),
-                        torch_dtype=torch.float16,
-                        device_map="cpu",  # Load to CPU for saving
-                        trust_remote_code=True,
-                        low_cpu_mem_usage=True,
-                    )
-                    
-                    logger.info(f"💾 Saving FP16 version...")
-                    if progress_callback:
-                        progress_callback(DownloadProgress(
-                            status="saving_fp16",
-                            model_id=model_id,
-                            files_completed=idx,
-                            files_total=len(quantizations),
-                        ))
-                    model.save_pretrained(str(output_path))
-                    tokenizer.save_pretrained(str(output_path))
-                    
-                    # Mark download as complete
-                    (output_path / ".download_complete").write_text(
-                        f"Completed: {datetime.now().isoformat()}"
-                    )
-                    incomplete_marker.unlink(missing_ok=True)
-                    
-                    logger.info(f"✅ FP16 version saved to {output_path}")
-                    
-                    # Free memory
-                    del model
-                    del tokenizer
-                    gc.collect()
-                    
-                    output_paths.append(output_path)
-                    
-                else:
-                    # Full precision (fp32) - just copy files
-                    logger.info(f"📁 Copying FP32 model files...")
-                    self._link_or_copy_model_files(
-                        src_dir=cache_path,
-                        dest_dir=output_path,
-                        model_id=model_id,
+                        
+                        paths_by_idx[idx] = output_path
+                        
+                    else:
+                        # Full precision (fp32) - just copy files
+                        def _copy_fp32(output_path=output_path, idx=idx, report=progress_callback):
+                            logger.info(f"📁 Copying FP32 model files...")
+                            self._link_or_copy_model_files(
+                                src_dir=cache_path,
+                                dest_dir=output_path,
+                                model_id=model_id,
+                                status="copying_fp32",
+                                progress_callback=report,
+                                files_completed=idx,
+                                files_total=len(quantizations),
+                            )
+                            
+                            # Mark download as complete
+                            self._finalize_variant(output_path, None)
+                            
+                            logger.info(f"✅ FP32 version ready")
+                        
+                        if len(quantizations) > 1:
+                            # Progress comes only from this thread; the background copy is
+                            # reported once below if the other variants finish before it
+                            fp32_job = self._io_executor.submit(_copy_fp32, report=None)
+                            fp32_idx = idx
+                        else:
+                            _copy_fp32()
+                        paths_by_idx[idx] = output_path
+                
+                if fp32_job is not None and not fp32_job.done() and progress_callback:
+                    progress_callback(DownloadProgress(
                         status="copying_fp32",
-                        progress_callback=progress_callback,
-                        files_completed=idx,
+                        model_id=model_id,
+                        files_completed=fp32_idx,
                         files_total=len(quantizations),
-                    )
-                    
-                    # Mark download as complete
-                    (output_path / ".download_complete").write_text(
-                        f"Completed: {datetime.now().isoformat()}"
-                    )
-                    incomplete_marker.unlink(missing_ok=True)
-                    
-                    logger.info(f"✅ FP32 version ready")
-                    output_paths.append(output_path)
+                    ))
+            finally:
+                # Never return (or clean the cache) while the copy is still reading it
+                if fp32_job is not None:
+                    wait([fp32_job])
+            if fp32_job is not None:
+                fp32_job.result()  # Surface copy errors
+            output_paths = [paths_by_idx[i] for i in sorted(paths_by_idx)]
+            
+            # Fresh variants must be rescanned even if the folder mtime didn't move
+            for path in output_paths:
+                self._list_cache.pop(path.name, None)
+            self._registry.invalidate()
             
             # Step 3: Clean up cache if not keeping
             if not keep_cache and cache_path.exists():
@@ -891,8 +1559,9 @@ class HFModelManager:
             
             return output_paths
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _download_and_quantize)
+        # Downloads queue on a dedicated worker; search/info and model loads stay responsive
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._dl_executor, _download_and_quantize)
     
     # Legacy single-quantization method for backwards compatibility
     async def download_model_single(
@@ -920,57 +1589,77 @@ class HFModelManager:
         if not self._models_dir.exists():
             return models
         
-        for model_dir in self._models_dir.iterdir():
-            if model_dir.is_dir():
-                # Skip the cache directory
-                if model_dir.name == "_cache":
-                    continue
-                
-                # Validate this is actually a model folder (has config.json or model files)
-                if not self._is_valid_model_dir(model_dir):
-                    continue
-                    
-                # Parse model name and quantization
-                name = model_dir.name
-                quantization = None
-                
-                if "__4bit" in name:
-                    quantization = "4bit"
-                    name = name.replace("__4bit", "")
-                elif "__8bit" in name:
-                    quantization = "8bit"
-                    name = name.replace("__8bit", "")
-                elif "__fp16" in name:
-                    quantization = "fp16"
-                    name = name.replace("__fp16", "")
-                elif "__fp32" in name:
-                    name = name.replace("__fp32", "")
-                elif "__original" in name:
-                    name = name.replace("__original", "")
-                
-                model_id = name.replace("__", "/")
-                
-                # Calculate size
-                total_size = sum(
-                    f.stat().st_size for f in model_dir.rglob("*") if f.is_file()
-                )
-                
-                # Get modification time
-                stat = model_dir.stat()
-                downloaded_at = datetime.fromtimestamp(stat.st_ctime).isoformat()
-                
-                models.append(ModelInfo(
-                    model_id=model_id,
-                    name=model_id.split("/")[-1] if "/" in model_id else model_id,
-                    size_bytes=total_size,
-                    quantization=quantization,
-                    downloaded_at=downloaded_at,
-                    local_path=str(model_dir),
-                    is_loaded=(self._loaded_model_id == model_id and 
-                              self._loaded_quantization == quantization),
-                ))
+        fingerprint = self._registry.fingerprint()
+        cached = self._registry.load(fingerprint)
+        if cached is not None:
+            return self._refresh_loaded_flags(cached)
         
-        return models
+        # Per-folder memo: only folders whose mtime moved are rescanned
+        list_cache: Dict[str, tuple[int, Optional[ModelInfo]]] = {}
+        for dir_name, mtime_ns in fingerprint:
+            hit = self._list_cache.get(dir_name)
+            if hit is not None and hit[0] == mtime_ns:
+                info = hit[1]
+            else:
+                info = self._scan_model_dir(self._models_dir / dir_name)
+            list_cache[dir_name] = (mtime_ns, info)
+            if info is not None:
+                models.append(info)
+        self._list_cache = list_cache
+        
+        self._registry.store(fingerprint, models)
+        return self._refresh_loaded_flags(models)
+    
+    def _refresh_loaded_flags(self, models: List[ModelInfo]) -> List[ModelInfo]:
+        """Loaded state is the only field that changes without touching the disk."""
+        for info in models:
+            info.is_loaded = (self._loaded_model_id == info.model_id and
+                              self._loaded_quantization == info.quantization)
+        return list(models)
+    
+    def _scan_model_dir(self, model_dir: Path) -> Optional[ModelInfo]:
+        """Build ModelInfo for a model folder, or None if it isn't a usable model."""
+        # Validate this is actually a model folder (has config.json or model files)
+        if not self._is_valid_model_dir(model_dir):
+            return None
+            
+        # Parse model name and quantization
+        name = model_dir.name
+        quantization = None
+        
+        if "__4bit" in name:
+            quantization = "4bit"
+            name = name.replace("__4bit", "")
+        elif "__8bit" in name:
+            quantization = "8bit"
+            name = name.replace("__8bit", "")
+        elif "__fp16" in name:
+            quantization = "fp16"
+            name = name.replace("__fp16", "")
+        elif "__fp32" in name:
+            name = name.replace("__fp32", "")
+        elif "__original" in name:
+            name = name.replace("__original", "")
+        
+        model_id = name.replace("__", "/")
+        
+        # Calculate size (recorded at download time; walk the folder for older models)
+        total_size = _read_model_meta(model_dir).get("size_bytes")
+        if total_size is None:
+            total_size = _dir_size_bytes(str(model_dir))
+        
+        # Get modification time
+        stat = model_dir.stat()
+        downloaded_at = datetime.fromtimestamp(stat.st_ctime).isoformat()
+        
+        return ModelInfo(
+            model_id=model_id,
+            name=model_id.split("/")[-1] if "/" in model_id else model_id,
+            size_bytes=total_size,
+            quantization=quantization,
+            downloaded_at=downloaded_at,
+            local_path=str(model_dir),
+        )
     
     def delete_local_model(self, model_id: str, quantization: Optional[str] = None) -> bool:
         """Delete a locally downloaded model."""
@@ -984,6 +1673,8 @@ class HFModelManager:
                 self.unload_model()
             
             shutil.rmtree(local_path)
+            self._list_cache.pop(local_path.name, None)
+            self._registry.invalidate()
             return True
         return False
     
@@ -1004,6 +1695,8 @@ class HFModelManager:
             return True
         
         def _load():
+            from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+            
             # Unload current model first
             self.unload_model()
             
@@ -1043,7 +1736,7 @@ class HFModelManager:
                     str(local_path),
                     trust_remote_code=True,
                 )
-                def strip_quantization_config(cfg: AutoConfig) -> None:
+                def strip_quantization_config(cfg: "AutoConfig") -> None:
                     """Remove embedded quantization_config to prevent auto-quantizer activation."""
                     try:
                         cfg.__dict__.pop("quantization_config", None)
@@ -1070,19 +1763,18 @@ class HFModelManager:
             
             logger.info(f"📦 Loading tokenizer for {model_id}...")
             
-            # Load tokenizer
-            self._loaded_tokenizer = AutoTokenizer.from_pretrained(
+            # Load tokenizer in the background; it only needs to be ready once the weights are
+            tokenizer_future = self._io_executor.submit(
+                AutoTokenizer.from_pretrained,
                 str(local_path),
                 trust_remote_code=True,
+                use_fast=True,
             )
             
-            # Set pad token if not set
-            if self._loaded_tokenizer.pad_token is None:
-                self._loaded_tokenizer.pad_token = self._loaded_tokenizer.eos_token
-            
             # Use effective quantization (from marker or parameter)
             # Determine compute dtype (bfloat16 if supported, otherwise float16)
-            compute_dtype = torch.bfloat16 if torch.cuda.is_available() and torch.cuda.is_bf16_supported() else torch.float16
+            compute_dtype = _compute_dtype()
+            _enable_tf32()
             
             logger.info(f"🔧 Loading model with {effective_quant or compute_dtype} precision...")
             
@@ -1118,11 +1810,17 @@ class HFModelManager:
                     "flash_attn_2", "fa2",
                 ])
             
+            def is_sdpa_unsupported_error(error: Exception) -> bool:
+                """Check if the architecture doesn't implement SDPA attention."""
+                msg = str(error).lower()
+                return "scaled_dot_product_attention" in msg or "sdpa" in msg
+            
             def _attempt_load(use_attn_impl: str, allow_offload: bool):
                 """Attempt to load the model with given attention impl and offload setting."""
                 kwargs = {
                     "trust_remote_code": True,
-                    "torch_dtype": "auto",
+                    # Never "auto": many configs declare float32, which doubles VRAM and skips Tensor Cores
+                    "torch_dtype": compute_dtype,
                     "low_cpu_mem_usage": True,
                     "attn_implementation": use_attn_impl,
                 }
@@ -1136,19 +1834,19 @@ class HFModelManager:
                     kwargs["device_map"] = {"": 0}
                 
                 if effective_quant in ("4bit", "8bit"):
+                    # torch_dtype stays compute_dtype: it sets the non-quantized modules' dtype, and
+                    # without it bitsandbytes forces fp16 next to a bf16 compute dtype
                     quant_config = get_quantization_config(effective_quant, allow_cpu_offload=allow_offload)
                     kwargs["quantization_config"] = quant_config
                 elif effective_quant == "fp16":
-                    kwargs["torch_dtype"] = torch.float16
+                    kwargs["torch_dtype"] = compute_dtype  # Half precision; bf16 where supported
                 elif effective_quant == "fp32":
                     kwargs["torch_dtype"] = torch.float32
                     if use_attn_impl == "flash_attention_2":
                         logger.warning("⚠️ Flash Attention 2 is incompatible with fp32. Switching to SDPA.")
                         kwargs["attn_implementation"] = "sdpa"
-                elif effective_quant is None:
-                    kwargs["torch_dtype"] = compute_dtype
-                    logger.info(f"   Using {compute_dtype} precision (auto)")
                 
+                logger.info(f"   Using {kwargs['torch_dtype']} weights")
                 return AutoModelForCausalLM.from_pretrained(
                     str(local_path),
                     **kwargs
@@ -1165,69 +1863,100 @@ class HFModelManager:
                     self._loaded_model = None
                 gc.collect()
                 gc.collect()
-                if torch.cuda.is_available():
+                if _cuda_available():
                     torch.cuda.empty_cache()
                     torch.cuda.synchronize()
                 time.sleep(0.5)
             
-            # Try GPU-only first (no meta tensors), fallback to offload if OOM
-            # Outer try: catch FA2 runtime errors and retry with SDPA
-            current_attn = attn_impl
-            try:
+            def _load_with_offload_fallback(use_attn_impl: str):
+                """GPU-only load (no meta tensors), falling back to CPU offload on OOM."""
                 try:
-                    logger.info(f"   🎯 Attempting GPU-only load...")
-                    self._loaded_model = _attempt_load(current_attn, allow_offload=False)
+                    logger.info(f"   🎯 Attempting GPU-only load ({use_attn_impl} attention)...")
+                    return _attempt_load(use_attn_impl, allow_offload=False)
                 except (RuntimeError, ValueError, torch.OutOfMemoryError) as e:
-                    if is_oom_error(e):
-                        logger.warning(f"   ⚠️ GPU-only load failed (OOM). Falling back to CPU offload...")
-                        del e
-                        _cleanup_gpu()
-                        self._loaded_model = _attempt_load(current_attn, allow_offload=True)
+                    if not is_oom_error(e):
+                        raise
+                    logger.warning(f"   ⚠️ GPU-only load failed (OOM). Falling back to CPU offload...")
+                    del e
+                _cleanup_gpu()
+                return _attempt_load(use_attn_impl, allow_offload=True)
+            
+            # Attention fallback chain: flash_attention_2 -> sdpa -> eager (only if the arch lacks SDPA)
+            current_attn = attn_impl
+            while True:
+                try:
+                    self._loaded_model = _load_with_offload_fallback(current_attn)
+                    break
+                except Exception as e:
+                    if current_attn == "flash_attention_2" and is_flash_attn_error(e):
+                        logger.warning(f"⚠️ Flash Attention 2 failed at runtime: {e}")
+                        logger.warning("⚠️ Falling back to SDPA attention. Your flash_attn installation may be incompatible.")
+                        current_attn = "sdpa"
+                    elif current_attn == "sdpa" and isinstance(e, ValueError) and is_sdpa_unsupported_error(e):
+                        logger.warning(f"⚠️ Model architecture does not support SDPA, using eager attention: {e}")
+                        current_attn = "eager"
                     else:
                         raise
-            except Exception as e:
-                if current_attn == "flash_attention_2" and is_flash_attn_error(e):
-                    logger.warning(f"⚠️ Flash Attention 2 failed at runtime: {e}")
-                    logger.warning("⚠️ Falling back to SDPA attention. Your flash_attn installation may be incompatible.")
-                    current_attn = "sdpa"
                     del e
                     _cleanup_gpu()
-                    
-                    try:
-                        logger.info(f"   🎯 Retrying load with SDPA attention...")
-                        self._loaded_model = _attempt_load(current_attn, allow_offload=False)
-                    except (RuntimeError, ValueError, torch.OutOfMemoryError) as e2:
-                        if is_oom_error(e2):
-                            logger.warning(f"   ⚠️ GPU-only load failed (OOM). Falling back to CPU offload...")
-                            del e2
-                            _cleanup_gpu()
-                            self._loaded_model = _attempt_load(current_attn, allow_offload=True)
-                        else:
-                            raise
-                else:
-                    raise
             
             logger.info(f"✅ Model loaded successfully!")
             
+            self._loaded_tokenizer = tokenizer_future.result()
+            if not self._loaded_tokenizer.is_fast:
+                # No tokenizer.json and no converter: streaming decodes run in pure Python
+                logger.warning(f"⚠️ No fast (Rust) tokenizer for {model_id}; token streaming will be slower")
+            
+            # Set pad token if not set
+            if self._loaded_tokenizer.pad_token is None:
+                self._loaded_tokenizer.pad_token = self._loaded_tokenizer.eos_token
+            
             # Set to eval mode for inference
             self._loaded_model.eval()
             
+            # Per-model generation defaults, built once; requests only override sampling knobs
+            base_gen_config = copy.deepcopy(self._loaded_model.generation_config)
+            base_gen_config.update(
+                pad_token_id=self._loaded_tokenizer.pad_token_id,
+                eos_token_id=self._loaded_tokenizer.eos_token_id,
+                use_cache=True,  # Enable KV cache (faster autoregressive generation)
+                output_scores=False,
+                output_hidden_states=False,
+                output_attentions=False,
+            )
+            self._base_gen_config = base_gen_config
+            
             # Apply torch.compile for faster inference (optional, disabled by default due to compatibility issues)
             settings = get_settings_manager()
             use_torch_compile = settings.get("model.use_torch_compile", False)
+            # Static KV cache: fixed shapes let the decode step be captured as a CUDA graph
+            self._use_static_cache = (
+                settings.get("model.use_static_cache", False)
+                and effective_quant not in ("4bit", "8bit")
+                and _cuda_available()
+            )
             
-            if use_torch_compile and effective_quant not in ("4bit", "8bit") and torch.cuda.is_available():
+            if use_torch_compile and effective_quant not in ("4bit", "8bit") and _cuda_available():
                 try:
                     logger.info(f"⚡ Applying torch.compile for faster inference...")
                     # Reset dynamo cache to avoid "duplicate template name" error
                     torch._dynamo.reset()
-                    # Use default mode which is more compatible
-                    self._loaded_model = torch.compile(
-                        self._loaded_model, 
-                        mode="default",  # Balanced mode, more compatible
-                        fullgraph=False,  # Allow partial graph compilation
-                        dynamic=True,  # Handle dynamic shapes
-                    )
+                    if self._use_static_cache:
+                        # Shapes are fixed by the static cache, so replay each decode step as a CUDA graph
+                        self._loaded_model.forward = torch.compile(
+                            self._loaded_model.forward,
+                            mode="reduce-overhead",
+                            fullgraph=True,
+                            dynamic=False,
+                        )
+                    else:
+                        # Use default mode which is more compatible
+                        self._loaded_model = torch.compile(
+                            self._loaded_model, 
+                            mode="default",  # Balanced mode, more compatible
+                            fullgraph=False,  # Allow partial graph compilation
+                            dynamic=True,  # Handle dynamic shapes
+                        )
                     logger.info(f"✅ torch.compile applied! First generation will be slower (compilation).")
                 except Exception as compile_error:
                     logger.warning(f"⚠️ torch.compile failed (will use eager mode): {compile_error}")
@@ -1235,13 +1964,27 @@ class HFModelManager:
             self._loaded_model_id = model_id
             self._loaded_quantization = effective_quant  # Use effective quantization
             
+            if effective_quant != "fp32" and _cuda_available():
+                # Pay kernel JIT / compile / CUDA-graph capture now instead of on the first message
+                self._submit_generation(self._warmup_generation).result()
+            
             return True
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(self._executor, _load)
     
-    def unload_model(self):
-        """Unload the currently loaded model from memory."""
+    def unload_model(self, force_empty: bool = False):
+        """
+        Unload the currently loaded model from memory.
+        
+        Freed blocks stay in PyTorch's caching allocator for the next load to reuse.
+        force_empty also hands them back to the driver (a full device sync), for when
+        other processes should get the VRAM.
+        """
+        # The static KV cache is sized for this model; drop it before the weights
+        self._static_kv_cache = None
+        self._static_kv_cache_len = 0
+        
         if self._loaded_model is not None:
             del self._loaded_model
             self._loaded_model = None
@@ -1252,14 +1995,16 @@ class HFModelManager:
         
         self._loaded_model_id = None
         self._loaded_quantization = None
+        self._use_static_cache = False
+        self._base_gen_config = None
         self.clear_kv_cache()
         
         gc.collect()
-        if torch.cuda.is_available():
+        if force_empty and _cuda_available():
             torch.cuda.empty_cache()
 
-    def unload_assistant_model(self):
-        """Unload the assistant model used for speculative decoding."""
+    def unload_assistant_model(self, force_empty: bool = False):
+        """Unload the assistant model used for speculative decoding (see unload_model for force_empty)."""
         if self._loaded_assistant_model is not None:
             del self._loaded_assistant_model
             self._loaded_assistant_model = None
@@ -1272,7 +2017,7 @@ class HFModelManager:
         self._loaded_assistant_quantization = None
         
         gc.collect()
-        if torch.cuda.is_available():
+        if force_empty and _cuda_available():
             torch.cuda.empty_cache()
         
         logger.info("🗑️ Assistant model unloaded")
@@ -1293,6 +2038,8 @@ class HFModelManager:
             return True
         
         def _load():
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+            
             # Unload current assistant model first
             self.unload_assistant_model()
             
@@ -1328,13 +2075,14 @@ class HFModelManager:
             self._loaded_assistant_tokenizer = AutoTokenizer.from_pretrained(
                 str(local_path),
                 trust_remote_code=True,
+                use_fast=True,
             )
             
             if self._loaded_assistant_tokenizer.pad_token is None:
                 self._loaded_assistant_tokenizer.pad_token = self._loaded_assistant_tokenizer.eos_token
             
             # Determine compute dtype for assistant model (match main model dtype)
-            compute_dtype = torch.bfloat16 if torch.cuda.is_available() and torch.cuda.is_bf16_supported() else torch.float16
+            compute_dtype = _compute_dtype()
             
             logger.info(f"🔧 Loading assistant model with {effective_quant or compute_dtype} precision...")
             
@@ -1352,7 +2100,7 @@ class HFModelManager:
             def _build_assistant_kwargs(use_attn: str):
                 kwargs = {
                     "trust_remote_code": True,
-                    "torch_dtype": "auto",
+                    "torch_dtype": compute_dtype,
                     "low_cpu_mem_usage": True,
                     "device_map": {"": 0},  # Load to GPU
                     "attn_implementation": use_attn,
@@ -1362,14 +2110,12 @@ class HFModelManager:
                     quant_config = get_quantization_config(effective_quant, allow_cpu_offload=False)
                     kwargs["quantization_config"] = quant_config
                 elif effective_quant == "fp16":
-                    kwargs["torch_dtype"] = torch.float16
+                    kwargs["torch_dtype"] = compute_dtype  # Half precision; bf16 where supported
                 elif effective_quant == "fp32":
                     kwargs["torch_dtype"] = torch.float32
                     if use_attn == "flash_attention_2":
                         logger.warning("⚠️ Flash Attention 2 is incompatible with fp32. Switching to SDPA for assistant model.")
                         kwargs["attn_implementation"] = "sdpa"
-                elif effective_quant is None:
-                    kwargs["torch_dtype"] = compute_dtype
                 return kwargs
             
             # Try loading with FA2, fallback to SDPA if it fails at runtime
@@ -1390,7 +2136,7 @@ class HFModelManager:
                     logger.warning("⚠️ Falling back to SDPA attention for assistant model.")
                     current_attn = "sdpa"
                     gc.collect()
-                    if torch.cuda.is_available():
+                    if _cuda_available():
                         torch.cuda.empty_cache()
                     
                     load_kwargs = _build_assistant_kwargs(current_attn)
@@ -1408,7 +2154,7 @@ class HFModelManager:
             logger.info(f"✅ Assistant model loaded: {model_id} ({effective_quant or 'original'})")
             return True
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(self._executor, _load)
 
     def request_stop(self):
@@ -1487,14 +2233,27 @@ class HFModelManager:
             self._kv_cache.pop(key, None)
 
     def _tokenize_prompt(self, prompt: str):
+        # A single prompt never needs padding; batched prompts would want padding="longest"
         return self._loaded_tokenizer(
             prompt,
             return_tensors="pt",
-            padding=True,
+            padding=False,
             truncation=True,
             max_length=self._max_prompt_length,
         )
 
+    def _inputs_to_device(self, inputs):
+        """Move tokenizer output to the model device.
+
+        On CUDA the tensors are staged in pinned memory so the copy is asynchronous
+        and queues on the current (generation) stream instead of stalling the host.
+        """
+        if self.device != "cuda":
+            return inputs.to(self.device)
+        for key, value in inputs.items():
+            inputs[key] = value.pin_memory().to(self.device, non_blocking=True)
+        return inputs
+
     def _supports_cache_position(self) -> bool:
         if not self._loaded_model:
             return False
@@ -1519,7 +2278,7 @@ class HFModelManager:
                 return int(key.shape[-2] if key.shape[-2] >= key.shape[-1] else key.shape[-1])
         return 0
 
-    def _slice_kv_tensor(self, tensor: torch.Tensor, max_len: int) -> torch.Tensor:
+    def _slice_kv_tensor(self, tensor: "torch.Tensor", max_len: int) -> "torch.Tensor":
         if tensor is None or not hasattr(tensor, "ndim") or tensor.ndim < 3:
             return tensor
         seq_dim = -2 if tensor.shape[-2] >= tensor.shape[-1] else -1
@@ -1592,11 +2351,9 @@ class HFModelManager:
     ) -> None:
         if not cache_key or not history_prompt or not self.is_model_loaded:
             return
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            self._executor,
+        await asyncio.wrap_future(self._submit_generation(
             lambda: self._update_session_kv_cache_sync(cache_key, history_prompt, cache_state),
-        )
+        ))
 
     def _update_session_kv_cache_sync(
         self,
@@ -1650,6 +2407,77 @@ class HFModelManager:
     # Generation
     # ============================================
     
+    def _static_cache_for(self, seq_len: int) -> Any:
+        """
+        Get a reset StaticCache holding at least seq_len positions.
+        
+        One cache is kept per loaded model and reused, so requests don't allocate and free
+        hundreds of MB of KV buffers each time. It is only reallocated to grow, rounded up to
+        a power of two, which also bounds how many shapes compiled CUDA graphs are captured for.
+        Call on the generation thread.
+        """
+        if self._static_kv_cache is not None and self._static_kv_cache_len >= seq_len:
+            self._static_kv_cache.reset()
+            return self._static_kv_cache
+        
+        from transformers import StaticCache
+        
+        cache_len = max(_STATIC_CACHE_MIN_LEN, 1 << (seq_len - 1).bit_length())
+        self._static_kv_cache = None  # Free the old buffers before allocating larger ones
+        # The constructor signature moved between transformers releases; pass what it takes
+        params = inspect.signature(StaticCache.__init__).parameters
+        candidate_kwargs = {
+            "config": self._loaded_model.config,
+            "max_cache_len": cache_len,
+            "max_batch_size": 1,
+            "device": self.device,
+            "dtype": self._loaded_model.dtype,
+        }
+        self._static_kv_cache = StaticCache(
+            **{key: value for key, value in candidate_kwargs.items() if key in params}
+        )
+        self._static_kv_cache_len = cache_len
+        logger.info(f"🧱 Allocated static KV cache for {cache_len} tokens")
+        return self._static_kv_cache
+    
+    def _warmup_generation(self) -> None:
+        """Run a tiny greedy generation on the generation thread (best effort)."""
+        start_time = time.time()
+        try:
+            with self._generation_lock, torch.inference_mode():
+                input_ids = torch.zeros((1, 8), dtype=torch.long, device=self.device)
+                self._loaded_model.generate(
+                    input_ids=input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    generation_config=self._generation_config(4, 1.0, 1.0, 0, 1.0, False),
+                    # Same cache object real requests get, so graphs are captured for its shape
+                    past_key_values=self._static_cache_for(12) if self._use_static_cache else None,
+                )
+            logger.info(f"🔥 Warmup generation done in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            logger.warning(f"⚠️ Warmup generation failed (first request will be slower): {e}")
+    
+    def _generation_config(
+        self,
+        max_new_tokens: int,
+        temperature: float,
+        top_p: float,
+        top_k: int,
+        repetition_penalty: float,
+        do_sample: bool,
+    ):
+        """Copy the loaded model's base GenerationConfig with this request's sampling settings."""
+        config = copy.deepcopy(self._base_gen_config)
+        config.update(
+            max_new_tokens=max_new_tokens,
+            temperature=temperature if do_sample else 1.0,
+            top_p=top_p if do_sample else 1.0,
+            top_k=top_k if do_sample else 0,
+            repetition_penalty=repetition_penalty,
+            do_sample=do_sample,
+        )
+        return config
+    
     async def generate(
         self,
         prompt: str,
@@ -1680,15 +2508,54 @@ class HFModelManager:
 
         self._stop_event.clear()
 
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextStreamer
+
         class _StopOnEvent(StoppingCriteria):
+            """Polls the stop event every few steps (counted per call, so assisted steps count once)."""
+
             def __init__(self, stop_event: threading.Event):
                 self.stop_event = stop_event
+                self.calls = 0
+                self.stopped = False
 
             def __call__(self, input_ids, scores, **kwargs):
-                return self.stop_event.is_set()
+                self.calls += 1
+                if not self.stopped and self.calls % _STOP_CHECK_INTERVAL == 0:
+                    self.stopped = self.stop_event.is_set()
+                return self.stopped
 
         loop = asyncio.get_running_loop()
-        queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        queue: asyncio.Queue[Optional[List[str]]] = asyncio.Queue()
+
+        class _LoopStreamer(TextStreamer):
+            """Hands decoded text to the event loop in batches, one wakeup per flush."""
+
+            def __init__(self, tokenizer):
+                # No cleanup regex pass: it runs on every decode, i.e. once per streamed token
+                super().__init__(
+                    tokenizer,
+                    skip_prompt=True,
+                    skip_special_tokens=True,
+                    clean_up_tokenization_spaces=False,
+                )
+                self.pending: List[str] = []
+                self.last_flush = time.monotonic()
+
+            def on_finalized_text(self, text: str, stream_end: bool = False):
+                if text:
+                    self.pending.append(text)
+                if (
+                    stream_end
+                    or len(self.pending) >= _STREAM_FLUSH_TOKENS
+                    or time.monotonic() - self.last_flush >= _STREAM_FLUSH_INTERVAL
+                ):
+                    self.flush()
+
+            def flush(self):
+                if self.pending:
+                    loop.call_soon_threadsafe(queue.put_nowait, self.pending)
+                    self.pending = []
+                self.last_flush = time.monotonic()
 
         cache_entry = self._get_kv_cache_entry(cache_key) if use_session_cache else None
 
@@ -1696,8 +2563,9 @@ class HFModelManager:
             try:
                 with self._generation_lock, torch.inference_mode():
                     # Tokenize
-                    inputs = self._tokenize_prompt(prompt).to(self.device)
-                    prompt_ids = inputs.input_ids[0].tolist()
+                    inputs = self._tokenize_prompt(prompt)
+                    prompt_ids = inputs.input_ids[0].tolist()  # Read on host, before the copy
+                    inputs = self._inputs_to_device(inputs)
 
                     input_ids = inputs.input_ids
                     attention_mask = inputs.attention_mask
@@ -1733,38 +2601,31 @@ class HFModelManager:
                         past_key_values = None
 
                     # Create streamer
-                    streamer = TextIteratorStreamer(
-                        self._loaded_tokenizer,
-                        skip_prompt=True,
-                        skip_special_tokens=True,
-                    )
+                    streamer = _LoopStreamer(self._loaded_tokenizer)
 
-                    # Generation config with static KV cache for faster inference
                     gen_kwargs = {
                         "input_ids": input_ids,
                         "attention_mask": attention_mask,
-                        "max_new_tokens": max_new_tokens,
-                        "temperature": temperature if do_sample else 1.0,
-                        "top_p": top_p if do_sample else 1.0,
-                        "top_k": top_k if do_sample else 0,
-                        "repetition_penalty": repetition_penalty,
-                        "do_sample": do_sample,
-                        "use_cache": True,  # Enable KV cache (faster autoregressive generation)
+                        "generation_config": self._generation_config(
+                            max_new_tokens, temperature, top_p, top_k, repetition_penalty, do_sample,
+                        ),
                         "streamer": streamer,
-                        "pad_token_id": self._loaded_tokenizer.pad_token_id,
-                        "eos_token_id": self._loaded_tokenizer.eos_token_id,
                         "stopping_criteria": StoppingCriteriaList([_StopOnEvent(self._stop_event)]),
                         "return_dict_in_generate": True,
-                        "output_scores": False,
-                        "output_hidden_states": False,
-                        "output_attentions": False,
                     }
                     
                     # Speculative decoding with assistant model
-                    if use_speculative and self._loaded_assistant_model is not None:
+                    use_assistant = use_speculative and self._loaded_assistant_model is not None
+                    if use_assistant:
                         gen_kwargs["assistant_model"] = self._loaded_assistant_model
                         gen_kwargs["num_assistant_tokens"] = num_assistant_tokens
                         logger.debug(f"🚀 Using speculative decoding with K={num_assistant_tokens}")
+                    elif self._use_static_cache and not use_session_cache:
+                        # The shared static cache is reset per call, so it can't back session
+                        # caches (which outlive the call) or assisted decoding
+                        gen_kwargs["past_key_values"] = self._static_cache_for(
+                            input_ids.shape[1] + max_new_tokens
+                        )
 
                     if past_key_values is not None:
                         gen_kwargs["past_key_values"] = past_key_values
@@ -1778,30 +2639,14 @@ class HFModelManager:
                             )
                             gen_kwargs["cache_position"] = cache_position
 
-                    # Start generation in background thread
-                    result_container: Dict[str, Any] = {}
-
-                    def _run_generate():
-                        try:
-                            result_container["output"] = self._loaded_model.generate(**gen_kwargs)
-                        except Exception as e:
-                            result_container["error"] = e
-
-                    thread = threading.Thread(
-                        target=_run_generate,
-                        daemon=True
-                    )
-                    thread.start()
-
-                    # Stream tokens into async queue
-                    for token in streamer:
-                        loop.call_soon_threadsafe(queue.put_nowait, token)
-
-                    thread.join()
+                    # Already off the event loop: generate here, the streamer feeds the queue
+                    try:
+                        output_obj = self._loaded_model.generate(**gen_kwargs)
+                    finally:
+                        streamer.flush()
 
                     # Save cache state for caller
                     if cache_state is not None and use_session_cache and cache_key:
-                        output_obj = result_container.get("output")
                         past_from_generate = None
                         try:
                             past_from_generate = getattr(output_obj, "past_key_values", None)
@@ -1815,20 +2660,20 @@ class HFModelManager:
                             "cache_hit": cache_hit,
                             "prefix_len": prefix_len,
                         })
-
-                    # Surface generation errors
-                    if "error" in result_container:
-                        raise result_container["error"]
             finally:
                 loop.call_soon_threadsafe(queue.put_nowait, None)
 
-        threading.Thread(target=_worker, daemon=True).start()
+        job = self._submit_generation(_worker)
 
         while True:
-            token = await queue.get()
-            if token is None:
+            tokens = await queue.get()
+            if tokens is None:
                 break
-            yield token
+            for token in tokens:
+                yield token
+
+        # Surface generation errors
+        await asyncio.wrap_future(job)
     
     async def generate_complete(
         self,
@@ -1851,7 +2696,7 @@ class HFModelManager:
             
             with self._generation_lock, torch.inference_mode():
                 # Tokenize
-                inputs = self._tokenize_prompt(prompt).to(self.device)
+                inputs = self._inputs_to_device(self._tokenize_prompt(prompt))
                 
                 prompt_tokens = inputs.input_ids.shape[1]
                 
@@ -1859,15 +2704,13 @@ class HFModelManager:
                 outputs = self._loaded_model.generate(
                     input_ids=inputs.input_ids,
                     attention_mask=inputs.attention_mask,
-                    max_new_tokens=max_new_tokens,
-                    temperature=temperature if do_sample else 1.0,
-                    top_p=top_p if do_sample else 1.0,
-                    top_k=top_k if do_sample else 0,
-                    repetition_penalty=repetition_penalty,
-                    do_sample=do_sample,
-                    use_cache=True,  # Enable KV cache
-                    pad_token_id=self._loaded_tokenizer.pad_token_id,
-                    eos_token_id=self._loaded_tokenizer.eos_token_id,
+                    generation_config=self._generation_config(
+                        max_new_tokens, temperature, top_p, top_k, repetition_penalty, do_sample,
+                    ),
+                    past_key_values=(
+                        self._static_cache_for(prompt_tokens + max_new_tokens)
+                        if self._use_static_cache else None
+                    ),
                 )
                 
                 # Decode only new tokens
@@ -1875,6 +2718,7 @@ class HFModelManager:
                 text = self._loaded_tokenizer.decode(
                     generated_ids,
                     skip_special_tokens=True,
+                    clean_up_tokenization_spaces=False,  # Match the streaming path
                 )
                 
                 end_time = time.time()
@@ -1886,8 +2730,7 @@ class HFModelManager:
                     time_seconds=end_time - start_time,
                 )
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _generate)
+        return await asyncio.wrap_future(self._submit_generation(_generate))
     
     # ============================================
     # Chat Format
@@ -1939,20 +2782,12 @@ class HFModelManager:
                 pass
         
         # Fallback: Simple format
-        prompt_parts = []
-        
-        if system_prompt:
-            prompt_parts.append(f"System: {system_prompt}\n\n")
-        
-        for msg in messages:
-            role = msg.get("role", "user").capitalize()
-            content = msg.get("content", "")
-            prompt_parts.append(f"{role}: {content}\n")
-        
-        if add_generation_prompt:
-            prompt_parts.append("Assistant: ")
-        
-        return "".join(prompt_parts)
+        header = f"System: {system_prompt}\n\n" if system_prompt else ""
+        body = "".join(
+            f"{msg.get('role', 'user').capitalize()}: {msg.get('content', '')}\n"
+            for msg in messages
+        )
+        return header + body + ("Assistant: " if add_generation_prompt else "")
 
 
 # ============================================
@@ -0,0 +1,15 @@
+"""
+UltraChat - Lazy PyTorch Import
+Drop-in stand-in for ``import torch`` that defers the real import until first use.
+
+Usage: ``from . import lazy_torch as torch``
+"""
+
+import importlib
+
+
+def __getattr__(name: str):
+    """Import torch on first attribute access and cache the attribute here."""
+    value = getattr(importlib.import_module("torch"), name)
+    globals()[name] = value
+    return value
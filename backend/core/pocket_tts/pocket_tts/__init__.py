@@ -4,7 +4,11 @@ from beartype.claw import beartype_this_package
 beartype_this_package(conf=BeartypeConf(is_color=False))
 
 from pocket_tts.models.tts_model import TTSModel  # noqa: E402
-from pocket_tts.utils.utils import set_cache_directory, get_cache_directory  # noqa: E402
+from pocket_tts.utils.utils import (  # noqa: E402
+    get_cache_directory,
+    prefetch_predefined_voices,
+    set_cache_directory,
+)
 
 # Public methods:
 # TTSModel.device
@@ -15,5 +19,6 @@ from pocket_tts.utils.utils import set_cache_directory, get_cache_directory  # n
 # TTSModel.get_state_for_audio_prompt
 # set_cache_directory(path) - Set global cache directory before loading model
 # get_cache_directory() - Get current cache directory
+# prefetch_predefined_voices() - Download all preset voice embeddings into the cache
 
-__all__ = ["TTSModel", "set_cache_directory", "get_cache_directory"]
+__all__ = ["TTSModel", "set_cache_directory", "get_cache_directory", "prefetch_predefined_voices"]
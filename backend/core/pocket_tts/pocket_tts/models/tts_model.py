@@ -1,6 +1,7 @@
 import copy
 import logging
 import os
+import platform
 import queue
 import statistics
 import threading
@@ -45,6 +46,41 @@ from pocket_tts.utils.weights_loading import get_flow_lm_state_dict, get_mimi_st
 torch.set_num_threads(1)
 logger = logging.getLogger(__name__)
 
+# Submodules of each FlowLM transformer layer covered by each quantization group
+_QUANTIZE_GROUPS = {
+    "attention": ("self_attn.in_proj", "self_attn.out_proj"),
+    "ffn": ("linear1", "linear2"),
+}
+
+
+def _quantize_flow_lm(flow_lm: FlowLMModel, groups: tuple[str, ...]) -> bool:
+    """Apply dynamic int8 quantization to the FlowLM transformer's Linear layers in place.
+
+    Only the transformer backbone is quantized; the flow net and Mimi stay in fp32, since
+    Mimi's decoder feeds back into itself and accumulates int8 error. Returns False (leaving
+    the model untouched) when torch has no CPU quantization engine for this machine.
+    """
+    engines = torch.backends.quantized.supported_engines
+    is_arm = platform.machine().lower() in ("arm64", "aarch64")
+    engine = next(
+        (e for e in (("qnnpack",) if is_arm else ("fbgemm", "x86")) if e in engines), None
+    )
+    if engine is None:
+        logger.warning("No int8 quantization engine available, keeping FlowLM in fp32")
+        return False
+    torch.backends.quantized.engine = engine
+
+    targets = {
+        f"layers.{i}.{name}"
+        for i in range(len(flow_lm.transformer.layers))
+        for group in groups
+        for name in _QUANTIZE_GROUPS[group]
+    }
+    flow_lm.transformer = torch.ao.quantization.quantize_dynamic(
+        flow_lm.transformer, targets, dtype=torch.qint8
+    )
+    return True
+
 
 class TTSModel(nn.Module):
     def __init__(
@@ -64,6 +100,9 @@ class TTSModel(nn.Module):
         self.eos_threshold = eos_threshold
         self.config = config
         self.has_voice_cloning = True
+        # Lower-precision CPU autocast for the FlowLM during generation (None = fp32).
+        # Mimi decodes on its own thread, outside the autocast, so it always stays fp32.
+        self.autocast_dtype: torch.dtype | None = None
 
     @property
     def device(self) -> str:
@@ -172,6 +211,8 @@ class TTSModel(nn.Module):
         noise_clamp: float | int | None = DEFAULT_NOISE_CLAMP,
         eos_threshold: float = DEFAULT_EOS_THRESHOLD,
         cache_dir: str | Path | None = None,
+        quantize: bool = False,
+        quantize_groups: tuple[str, ...] = ("attention", "ffn"),
     ) -> Self:
         """Load a pre-trained TTS model with specified configuration.
 
@@ -192,6 +233,10 @@ class TTSModel(nn.Module):
                 make the model more likely to continue generating.
             cache_dir: Custom directory for caching downloaded model files.
                 If None, uses ~/.cache/pocket_tts by default.
+            quantize: Apply dynamic int8 quantization to the FlowLM transformer
+                (CPU only). Mimi and the flow net stay in fp32.
+            quantize_groups: Which transformer Linear layers to quantize, any of
+                "attention" and "ffn".
 
         Returns:
             TTSModel: Fully initialized model with loaded weights on cpu, ready for
@@ -210,6 +255,8 @@ class TTSModel(nn.Module):
         tts_model = TTSModel._from_pydantic_config_with_weights(
             config, temp, lsd_decode_steps, noise_clamp, eos_threshold
         )
+        if quantize and _quantize_flow_lm(tts_model.flow_lm, quantize_groups):
+            logger.info("FlowLM transformer quantized to int8 (%s)", ", ".join(quantize_groups))
         return tts_model
 
     def _run_flow_lm_and_increment_step(
@@ -555,6 +602,13 @@ class TTSModel(nn.Module):
             real_time_factor,
         )
 
+    def _flow_lm_autocast(self) -> torch.autocast:
+        return torch.autocast(
+            device_type="cpu",
+            dtype=self.autocast_dtype or torch.bfloat16,
+            enabled=self.autocast_dtype is not None,
+        )
+
     @torch.no_grad
     def _generate(
         self,
@@ -568,16 +622,18 @@ class TTSModel(nn.Module):
         max_gen_len = int(gen_len_sec * 12.5)
         prepared = self.flow_lm.conditioner.prepare(text_to_generate)
 
-        with display_execution_time("Prompting text"):
+        with display_execution_time("Prompting text"), self._flow_lm_autocast():
             self._run_flow_lm_and_increment_step(
                 model_state=model_state, text_tokens=prepared.tokens
             )
 
         def run_generation():
             try:
-                self._autoregressive_generation(
-                    model_state, max_gen_len, frames_after_eos, latents_queue
-                )
+                # Autocast state is per thread, so enter it again here
+                with self._flow_lm_autocast():
+                    self._autoregressive_generation(
+                        model_state, max_gen_len, frames_after_eos, latents_queue
+                    )
             except Exception as e:
                 logger.error(f"Error in autoregressive generation: {e}")
                 # Signal decoder to stop by putting None (completion sentinel)
@@ -672,7 +728,9 @@ class TTSModel(nn.Module):
         """
         if isinstance(audio_conditioning, str) and audio_conditioning in PREDEFINED_VOICES:
             # We get the audio conditioning directly from the safetensors file.
-            prompt = load_predefined_voice(audio_conditioning)
+            prompt = load_predefined_voice(
+                audio_conditioning, device=self.flow_lm.device, dtype=self.flow_lm.dtype
+            )
         else:
             if not self.has_voice_cloning and isinstance(audio_conditioning, (str, Path)):
                 raise ValueError(
@@ -62,16 +62,24 @@ class StreamingMultiheadAttention(StatefulModule):
     def _get_mask(self, shape: tuple[int, int], shift: int, device: torch.device) -> torch.Tensor:
         return _materialize_causal_mask(shape, shift=shift, device=device)
 
+    def _cache_device_dtype(self) -> tuple[torch.device, torch.dtype]:
+        weight = self.in_proj.weight
+        if callable(weight):
+            # Dynamically quantized Linear: CPU only, with float32 activations
+            return torch.device("cpu"), torch.float32
+        return weight.device, weight.dtype
+
     def init_state(self, batch_size: int, sequence_length: int) -> dict[str, torch.Tensor]:
         dim_per_head = self.embed_dim // self.num_heads
-        initial_current_end = torch.zeros((0,)).to(self.in_proj.weight.device)
+        device, dtype = self._cache_device_dtype()
+        initial_current_end = torch.zeros((0,)).to(device)
         return dict(
             current_end=initial_current_end,
             cache=torch.full(
                 (2, batch_size, sequence_length, self.num_heads, dim_per_head),
                 float("NaN"),
-                device=self.in_proj.weight.device,
-                dtype=self.in_proj.weight.dtype,
+                device=device,
+                dtype=dtype,
             ),
         )
 
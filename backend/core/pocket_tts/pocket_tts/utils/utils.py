@@ -1,14 +1,22 @@
 import hashlib
 import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 import requests
-import safetensors.torch
+import safetensors
 import torch
 from huggingface_hub import hf_hub_download
+from requests.adapters import HTTPAdapter
 from torch import nn
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
@@ -59,22 +67,25 @@ def make_cache_directory() -> Path:
 
 
 def print_nb_parameters(model: nn.Module, model_name: str):
-    logger = logging.getLogger(__name__)
-    state_dict = model.state_dict()
+    # Walk the parameters directly rather than building a state dict
     total = 0
-    for key, value in state_dict.items():
-        logger.info("%s: %,d", key, value.numel())
-        total += value.numel()
-    logger.info("Total number of parameters in %s: %,d", model_name, total)
+    for name, param in model.named_parameters():
+        numel = param.numel()
+        logger.info("%s: %s", name, f"{numel:,}")
+        total += numel
+    logger.info("Total number of parameters in %s: %s", model_name, f"{total:,}")
 
 
 def size_of_dict(state_dict: dict) -> int:
+    """Total tensor bytes in a (possibly nested) dict, walked iteratively."""
     total_size = 0
-    for value in state_dict.values():
-        if isinstance(value, torch.Tensor):
-            total_size += value.numel() * value.element_size()
-        elif isinstance(value, dict):
-            total_size += size_of_dict(value)
+    stack = [state_dict]
+    while stack:
+        for value in stack.pop().values():
+            if isinstance(value, torch.Tensor):
+                total_size += value.numel() * value.element_size()
+            elif isinstance(value, dict):
+                stack.append(value)
     return total_size
 
 
@@ -82,22 +93,127 @@ class display_execution_time:
     def __init__(self, task_name: str, print_output: bool = True):
         self.task_name = task_name
         self.print_output = print_output
-        self.start_time = None
+        self.start_ns = None
         self.elapsed_time_ms = None
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
 
     def __enter__(self):
-        self.start_time = time.monotonic()
+        self.start_ns = time.perf_counter_ns()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        end_time = time.monotonic()
-        self.elapsed_time_ms = int((end_time - self.start_time) * 1000)
+        self.elapsed_time_ms = (time.perf_counter_ns() - self.start_ns) // 1_000_000
         if self.print_output:
             self.logger.info("%s took %d ms", self.task_name, self.elapsed_time_ms)
         return False  # Don't suppress exceptions
 
 
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Shared session, so repeated and ranged downloads reuse pooled connections."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_maxsize=16,
+                    max_retries=Retry(
+                        total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504)
+                    ),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+# Below this size a single stream is as fast as splitting into ranges
+_PARALLEL_DOWNLOAD_MIN_SIZE = 16 << 20
+
+
+def _get_range(url: str, path: Path, start: int, end: int, cancel: threading.Event) -> None:
+    """Fetch bytes [start, end] of url into the same offsets of the preallocated file."""
+    headers = {"Range": f"bytes={start}-{end}"}
+    with _get_session().get(url, headers=headers, stream=True, timeout=(5, 60)) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise RuntimeError(f"Server ignored range request for {url}")
+        # A handle per worker keeps seek+write free of shared state (os.pwrite isn't on Windows)
+        with open(path, "r+b") as f:
+            f.seek(start)
+            written = 0
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                if cancel.is_set():
+                    return
+                written += f.write(chunk)
+    # A connection closed early can end the body without an error; the preallocated
+    # file would keep a zero-filled hole, so fail and let the caller discard it
+    if written != end - start + 1:
+        raise IOError(f"Short range read for {url}: got {written} of {end - start + 1} bytes")
+
+
+def _parallel_http_download(url: str, path: Path, workers: int = 8, chunk: int = 8 << 20) -> bool:
+    """Download url into path with concurrent range requests.
+
+    Returns False without downloading when the server doesn't advertise byte ranges or the
+    file is too small to benefit; the caller then falls back to a single stream.
+    """
+    head = _get_session().head(url, allow_redirects=True, timeout=(5, 30))
+    head.raise_for_status()
+    size = int(head.headers.get("Content-Length", 0))
+    if head.headers.get("Accept-Ranges", "").lower() != "bytes" or size < _PARALLEL_DOWNLOAD_MIN_SIZE:
+        return False
+
+    part_size = max(chunk, -(-size // workers))
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+    cancel = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [
+            executor.submit(_get_range, head.url, path, start, end, cancel) for start, end in ranges
+        ]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            # Includes KeyboardInterrupt: stop the other workers instead of finishing the file
+            cancel.set()
+            for future in futures:
+                future.cancel()
+            raise
+    return True
+
+
+def _url_digest(url: str) -> str:
+    """Short, non-cryptographic-use cache key for a URL."""
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _download_hf_file(file_path: str, cache_dir: Path) -> Path:
+    """Resolve an hf://owner/repo/path[@revision] URL to a local file, once per process."""
+    owner, _, rest = file_path.removeprefix("hf://").partition("/")
+    repo_name, _, filename = rest.partition("/")
+    repo_id = f"{owner}/{repo_name}"
+    filename, _, revision = filename.partition("@")
+    revision = revision or None
+    # Use custom cache directory for HuggingFace downloads. The backend (hf_transfer or not)
+    # follows the process-wide HF_HUB_ENABLE_HF_TRANSFER setting.
+    cached_file = hf_hub_download(
+        repo_id=repo_id,
+        filename=filename,
+        revision=revision,
+        cache_dir=str(cache_dir),
+    )
+    return Path(cached_file)
+
+
 def download_if_necessary(file_path: str, cache_dir: Optional[Path] = None) -> Path:
     """Download a file if not already cached.
     
@@ -112,44 +228,58 @@ def download_if_necessary(file_path: str, cache_dir: Optional[Path] = None) -> P
         cache_dir = get_cache_directory()
     
     if file_path.startswith("http://") or file_path.startswith("https://"):
-        cached_file = cache_dir / (
-            hashlib.sha256(file_path.encode()).hexdigest() + "." + file_path.split(".")[-1]
-        )
+        suffix = "." + file_path.split(".")[-1]
+        cached_file = cache_dir / (_url_digest(file_path) + suffix)
         if not cached_file.exists():
-            logger = logging.getLogger(__name__)
-            logger.info(f"Downloading {file_path} to {cached_file}")
-            response = requests.get(file_path)
-            response.raise_for_status()
-            with open(cached_file, "wb") as f:
-                f.write(response.content)
+            # Files cached before the switch to blake2b are named by sha256
+            legacy_file = cache_dir / (hashlib.sha256(file_path.encode()).hexdigest() + suffix)
+            if legacy_file.exists():
+                return legacy_file
+            logger.info("Downloading %s to %s", file_path, cached_file)
+            # Write next to the target and rename when complete, so an interrupted
+            # download never leaves a truncated file that later passes exists()
+            part_file = cached_file.with_name(cached_file.name + ".part")
+            try:
+                if not _parallel_http_download(file_path, part_file):
+                    with _get_session().get(file_path, stream=True, timeout=(5, 60)) as response:
+                        response.raise_for_status()
+                        with open(part_file, "wb") as f:
+                            for chunk in response.iter_content(chunk_size=1 << 20):
+                                f.write(chunk)
+                os.replace(part_file, cached_file)
+            except BaseException:
+                part_file.unlink(missing_ok=True)
+                raise
         return cached_file
     elif file_path.startswith("hf://"):
-        file_path = file_path.removeprefix("hf://")
-        splitted = file_path.split("/")
-        repo_id = "/".join(splitted[:2])
-        filename = "/".join(splitted[2:])
-        if "@" in filename:
-            filename, revision = filename.split("@")
-        else:
-            revision = None
-        # Use custom cache directory for HuggingFace downloads
-        cached_file = hf_hub_download(
-            repo_id=repo_id, 
-            filename=filename, 
-            revision=revision,
-            cache_dir=str(cache_dir)
-        )
-        return Path(cached_file)
+        return _download_hf_file(file_path, cache_dir)
     else:
         return Path(file_path)
 
 
-def load_predefined_voice(voice_name: str) -> torch.Tensor:
+def prefetch_predefined_voices(max_workers: int = 8) -> None:
+    """Download every predefined voice embedding concurrently into the cache."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(download_if_necessary, PREDEFINED_VOICES.values()))
+
+
+@lru_cache(maxsize=2 * len(PREDEFINED_VOICES))
+def load_predefined_voice(
+    voice_name: str, device: str | torch.device = "cpu", dtype: torch.dtype | None = torch.float32
+) -> torch.Tensor:
+    """Load a predefined voice embedding, already on device and in dtype.
+
+    Cached per (voice, device, dtype): the returned tensor is shared and must not be
+    modified in place.
+    """
     if voice_name not in PREDEFINED_VOICES:
         raise ValueError(
             f"Predefined voice '{voice_name}' not found"
             f", available voices are {list(PREDEFINED_VOICES)}."
         )
     voice_file = download_if_necessary(PREDEFINED_VOICES[voice_name])
-    # There is only one tensor in the file.
-    return safetensors.torch.load_file(voice_file)["audio_prompt"]
+    # There is only one tensor in the file; read it through the mmap instead of
+    # materializing the whole file
+    with safetensors.safe_open(str(voice_file), framework="pt", device="cpu") as f:
+        prompt = f.get_tensor("audio_prompt")
+    return prompt.to(device=device, dtype=dtype).contiguous()
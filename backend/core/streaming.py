@@ -5,10 +5,40 @@ Server-Sent Events helpers for real-time streaming responses.
 
 import json
 import asyncio
-from typing import AsyncGenerator, Any, Dict, Optional
+from typing import AsyncGenerator, Any, Callable, Dict, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+# Optional fast JSON encoder - falls back to the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps_json_bytes(obj: Any) -> bytes:
+    """Serialize an object to compact UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_json(obj: Any) -> str:
+    """Serialize an object to a compact JSON string."""
+    return dumps_json_bytes(obj).decode("utf-8")
+
+
+def loads_json(data: "str | bytes") -> Any:
+    """Parse JSON text or bytes (orjson errors subclass json.JSONDecodeError)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Blank line ends an SSE event
+_EVENT_END = b"\n\n"
+
 
 class StreamEventType(str, Enum):
     """Types of streaming events."""
@@ -27,36 +57,37 @@ class StreamEvent:
     data: Any
     id: Optional[str] = None
     
-    def to_sse(self) -> str:
-        """Convert to SSE format."""
-        lines = []
-        
-        if self.id:
-            lines.append(f"id: {self.id}")
-        
-        lines.append(f"event: {self.event.value}")
-        
+    def to_sse(self) -> bytes:
+        """Convert to an SSE frame, already UTF-8 encoded for the response."""
         # Serialize data to JSON
         if isinstance(self.data, dict):
-            data_str = json.dumps(self.data)
+            data = dumps_json_bytes(self.data)
         elif isinstance(self.data, str):
-            data_str = self.data
+            data = self.data.encode("utf-8")
         else:
-            data_str = json.dumps({"value": self.data})
+            data = dumps_json_bytes({"value": self.data})
         
-        lines.append(f"data: {data_str}")
-        lines.append("")  # Empty line to end event
-        
-        return "\n".join(lines) + "\n"
+        # Blank line ends the event
+        head = f"event: {self.event.value}\ndata: ".encode("utf-8")
+        if self.id:
+            head = f"id: {self.id}\n".encode("utf-8") + head
+        return head + data + _EVENT_END
+    
+    def to_bytes(self) -> bytes:
+        """Serialize the event itself to JSON bytes."""
+        return dumps_json_bytes(asdict(self))
 
 
-def create_token_event(token: str, message_id: Optional[str] = None) -> str:
-    """Create a token streaming event."""
-    return StreamEvent(
-        event=StreamEventType.TOKEN,
-        data={"token": token},
-        id=message_id
-    ).to_sse()
+# Token events are sent once per generated token, so their framing is built once here
+_TOKEN_EVENT_PREFIX = f"event: {StreamEventType.TOKEN.value}\ndata: ".encode("utf-8")
+
+
+def create_token_event(token: str, message_id: Optional[str] = None) -> bytes:
+    """Create a token streaming event (same output as StreamEvent.to_sse, without the object)."""
+    payload = dumps_json_bytes({"token": token})
+    if message_id:
+        return f"id: {message_id}\n".encode("utf-8") + _TOKEN_EVENT_PREFIX + payload + _EVENT_END
+    return _TOKEN_EVENT_PREFIX + payload + _EVENT_END
 
 
 def create_done_event(
@@ -65,7 +96,7 @@ def create_done_event(
     eval_duration: Optional[float] = None,
     context: Optional[list] = None,
     conversation_id: Optional[str] = None
-) -> str:
+) -> bytes:
     """Create a completion event."""
     data = {"message_id": message_id}
     if total_tokens is not None:
@@ -84,7 +115,7 @@ def create_done_event(
     ).to_sse()
 
 
-def create_error_event(error: str, code: Optional[str] = None) -> str:
+def create_error_event(error: str, code: Optional[str] = None) -> bytes:
     """Create an error event."""
     data = {"error": error}
     if code:
@@ -96,7 +127,7 @@ def create_error_event(error: str, code: Optional[str] = None) -> str:
     ).to_sse()
 
 
-def create_status_event(status: str, details: Optional[Dict] = None) -> str:
+def create_status_event(status: str, details: Optional[Dict] = None) -> bytes:
     """Create a status event."""
     data = {"status": status}
     if details:
@@ -113,7 +144,7 @@ def create_progress_event(
     percent: Optional[float] = None,
     completed: Optional[int] = None,
     total: Optional[int] = None
-) -> str:
+) -> bytes:
     """Create a progress event (for downloads)."""
     data = {"status": status}
     if percent is not None:
@@ -129,7 +160,7 @@ def create_progress_event(
     ).to_sse()
 
 
-def create_metadata_event(metadata: Dict[str, Any]) -> str:
+def create_metadata_event(metadata: Dict[str, Any]) -> bytes:
     """Create a metadata event."""
     return StreamEvent(
         event=StreamEventType.METADATA,
@@ -137,16 +168,103 @@ def create_metadata_event(metadata: Dict[str, Any]) -> str:
     ).to_sse()
 
 
-async def heartbeat_generator(
-    interval: float = 15.0
-) -> AsyncGenerator[str, None]:
-    """
-    Generate periodic heartbeat events to keep connection alive.
-    Use this in conjunction with actual data streams.
-    """
+async def _ticker(tick: asyncio.Event, interval: float):
+    """Set the event every interval seconds."""
     while True:
         await asyncio.sleep(interval)
-        yield ": heartbeat\n\n"
+        tick.set()
+
+
+async def sse_stream(
+    queue: Any,
+    heartbeat: float = 15.0,
+    heartbeat_event: Optional[Callable[[], Optional[bytes]]] = None
+) -> AsyncGenerator[bytes, None]:
+    """
+    Yield framed SSE events from a queue, with heartbeats while it is idle.
+    
+    The queue (asyncio.Queue or BoundedEventQueue) carries already-framed event
+    bytes; None ends the stream. Heartbeats come from one ticker task setting an
+    Event, so an idle client costs a wakeup per interval rather than a
+    wait_for timeout exception. heartbeat_event, if given, builds the heartbeat
+    frame instead of an SSE comment; returning None skips that tick.
+    """
+    tick = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(tick, heartbeat))
+    getter = None
+    waiter = None
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.create_task(queue.get())
+            if waiter is None:
+                waiter = asyncio.create_task(tick.wait())
+            done, _ = await asyncio.wait(
+                {getter, waiter}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if waiter in done:
+                waiter = None
+                tick.clear()
+                frame = heartbeat_event() if heartbeat_event is not None else b": heartbeat\n\n"
+                if frame is not None:
+                    yield frame
+            if getter in done:
+                event = getter.result()
+                getter = None
+                if event is None:
+                    break
+                yield event
+    finally:
+        for task in (ticker, getter, waiter):
+            if task is not None:
+                task.cancel()
+
+
+class BoundedEventQueue:
+    """
+    Bounded queue between an event producer and one streaming client.
+    
+    Caps memory per client when the producer outruns a slow consumer: non-critical
+    events (progress ticks, heartbeats) evict the oldest queued event when full,
+    critical ones wait for room for at most critical_timeout seconds.
+    """
+    
+    def __init__(self, maxsize: int = 1000, critical_timeout: float = 5.0):
+        self.q: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.critical_timeout = critical_timeout
+        self.dropped = 0
+    
+    def offer_nowait(self, event: Any):
+        """Queue a non-critical event, dropping the oldest queued one if full."""
+        try:
+            self.q.put_nowait(event)
+        except asyncio.QueueFull:
+            self.q.get_nowait()
+            self.q.put_nowait(event)
+            self.dropped += 1
+    
+    async def offer(self, event: Any, critical: bool = False):
+        """
+        Queue an event.
+        
+        Critical events are never dropped; raises asyncio.TimeoutError if the consumer
+        makes no room in time, so the caller can give up on the client.
+        """
+        if not critical:
+            self.offer_nowait(event)
+            return
+        await asyncio.wait_for(self.q.put(event), timeout=self.critical_timeout)
+    
+    async def get(self) -> Any:
+        """Wait for the next event."""
+        return await self.q.get()
+    
+    def get_nowait(self) -> Any:
+        """Next event, or raise asyncio.QueueEmpty."""
+        return self.q.get_nowait()
+    
+    def empty(self) -> bool:
+        return self.q.empty()
 
 
 class StreamBuffer:
@@ -156,18 +274,19 @@ class StreamBuffer:
     """
     
     def __init__(self):
-        self._content = []
+        # UTF-8 bytes in one growable buffer rather than a list of small strings
+        self._buf = bytearray()
         self._token_count = 0
     
     def add_token(self, token: str):
         """Add a token to the buffer."""
-        self._content.append(token)
+        self._buf += token.encode("utf-8")
         self._token_count += 1
     
     @property
     def content(self) -> str:
         """Get the full accumulated content."""
-        return "".join(self._content)
+        return self._buf.decode("utf-8")
     
     @property
     def token_count(self) -> int:
@@ -176,5 +295,5 @@ class StreamBuffer:
     
     def clear(self):
         """Clear the buffer."""
-        self._content.clear()
+        self._buf.clear()
         self._token_count = 0
@@ -4,19 +4,28 @@ Handles TTS (Pocket TTS) and STT (Vosk) with streaming support.
 """
 
 import os
-import re
 import gc
 import time
+import shutil
+import zipfile
+import tempfile
+import traceback
 import asyncio
 import logging
 import threading
+import importlib.util
+import queue as queue_module
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Optional, Dict, Any, List, AsyncGenerator, Callable
+from typing import Optional, Dict, Any, List, AsyncGenerator, Callable, Tuple
 from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 import numpy as np
 
+from .streaming import loads_json
+
 logger = logging.getLogger("ultrachat.voice")
 
 # Optional imports - gracefully handle missing packages
@@ -29,11 +38,15 @@ except ImportError:
 
 # Import Pocket TTS (installed as editable package)
 try:
-    from pocket_tts import TTSModel as PocketTTSModel
+    from pocket_tts import (
+        TTSModel as PocketTTSModel,
+        prefetch_predefined_voices,
+        set_cache_directory as set_tts_cache_directory,
+    )
     POCKET_TTS_AVAILABLE = True
 except ImportError as e:
     POCKET_TTS_AVAILABLE = False
-    logger.warning(f"Pocket TTS not available: {e}")
+    logger.warning("Pocket TTS not available: %s", e)
 
 try:
     from vosk import Model as VoskModel, KaldiRecognizer
@@ -62,6 +75,9 @@ class VoiceSettings:
     vad_aggressiveness: int = 2  # 0-3, higher = more aggressive
     chunk_max_words: int = 16
     chunk_max_wait_s: float = 0.7
+    tts_quantize: bool = True  # Dynamic int8 FlowLM transformer (CPU)
+    tts_quantize_groups: Tuple[str, ...] = ("attention", "ffn")
+    tts_bf16: bool = False  # BF16 autocast for the FlowLM on CPUs with native BF16 (fp32 Linear only)
 
 
 @dataclass
@@ -71,6 +87,26 @@ class TokenChunk:
     is_final: bool = False
 
 
+# Preset voices that work without gated access
+_PRESET_VOICES = frozenset({"alba", "marius", "javert", "jean", "fantine", "cosette", "eponine", "azelma"})
+
+
+# STT audio is fed to Vosk in whole 100 ms frames (16 kHz mono PCM16)
+_STT_FRAME_BYTES = 3200
+
+# Vosk archives at least this big are fetched with parallel range requests
+_STT_PARALLEL_MIN_SIZE = 128 << 20
+_STT_PARALLEL_PARTS = 4
+
+
+class _RangesIgnored(Exception):
+    """The server answered a range request with something other than 206."""
+
+
+# Voice prompt states kept per TTS model (each is a prompted KV cache)
+_VOICE_STATE_CACHE_SIZE = 8
+
+
 # ============================================
 # Token Chunker
 # ============================================
@@ -79,7 +115,6 @@ class TokenChunker:
     """
     Buffers LLM tokens and commits chunks to TTS when boundaries are hit.
     """
-    _END_RE = re.compile(r"[.!?]\s*$")
     
     def __init__(
         self,
@@ -87,42 +122,66 @@ class TokenChunker:
         max_chars: int = 220,
         max_wait_s: float = 0.7
     ):
-        self.buf = ""
-        self.last_commit_t = time.time()
+        # Tokens are kept as parts with running counts, so feed() never rescans the buffer
+        self._parts: List[str] = []
+        self._chars = 0
+        self._words = 0
+        self._after_space = True  # Whether the buffer ends in whitespace (or is empty)
+        self._ends_sentence = False  # Whether the last non-space char is .!?
+        self.last_commit_t = time.monotonic()
         self.max_words = max_words
         self.max_chars = max_chars
         self.max_wait_s = max_wait_s
     
+    @property
+    def buf(self) -> str:
+        """Current uncommitted text."""
+        return "".join(self._parts)
+    
+    def _take(self) -> Optional[str]:
+        """Return the stripped buffer (None if blank) and clear it."""
+        chunk = "".join(self._parts).strip()
+        self._parts = []
+        self._chars = 0
+        self._words = 0
+        self._after_space = True
+        self._ends_sentence = False
+        return chunk if chunk else None
+    
     def feed(self, token_text: str) -> Optional[str]:
         """Feed a token. Returns committed chunk if ready, else None."""
-        self.buf += token_text
-        now = time.time()
+        self._parts.append(token_text)
+        self._chars += len(token_text)
+        if token_text:
+            words = token_text.split()
+            if words:
+                # A word continued from the previous token isn't a new one
+                self._words += len(words) - (not self._after_space and not token_text[0].isspace())
+                self._ends_sentence = words[-1][-1] in ".!?"
+            self._after_space = token_text[-1].isspace()
+        now = time.monotonic()
         
-        words = self.buf.strip().split()
+        # Only the new token can add a newline
         if (
-            self._END_RE.search(self.buf) or
-            "\n" in self.buf or
-            len(words) >= self.max_words or
-            len(self.buf) >= self.max_chars or
+            self._ends_sentence or
+            "\n" in token_text or
+            self._words >= self.max_words or
+            self._chars >= self.max_chars or
             (now - self.last_commit_t) >= self.max_wait_s
         ):
-            chunk = self.buf.strip()
-            self.buf = ""
             self.last_commit_t = now
-            return chunk if chunk else None
+            return self._take()
         
         return None
     
     def flush(self) -> Optional[str]:
         """Flush remaining buffer."""
-        chunk = self.buf.strip()
-        self.buf = ""
-        return chunk if chunk else None
+        return self._take()
     
     def reset(self):
         """Clear the buffer."""
-        self.buf = ""
-        self.last_commit_t = time.time()
+        self._take()
+        self.last_commit_t = time.monotonic()
 
 
 # ============================================
@@ -134,16 +193,53 @@ def wav_to_pcm16_bytes(wav_tensor) -> bytes:
     if not TORCH_AVAILABLE:
         return b""
     
-    x = wav_tensor.squeeze(0).detach()
-    x = torch.clamp(x, -1.0, 1.0)
-    pcm16 = (x * 32767.0).to(torch.int16).cpu().numpy()
-    return pcm16.tobytes()
+    # One host copy, then vectorized NumPy ops (no extra device kernels or int16 transfer)
+    x = wav_tensor.squeeze(0).detach().to("cpu", dtype=torch.float32).numpy()
+    x = np.clip(x, -1.0, 1.0)  # New array: x may share memory with the caller's tensor
+    x *= 32767.0
+    return x.astype(np.int16).tobytes()
 
 
 def pcm16_to_float32(pcm16_bytes: bytes) -> np.ndarray:
     """Convert PCM16 bytes to float32 numpy array."""
     pcm16 = np.frombuffer(pcm16_bytes, dtype=np.int16)
-    return pcm16.astype(np.float32) / 32768.0
+    return pcm16.astype(np.float32) * (1.0 / 32768.0)
+
+
+def _dir_size(path: str) -> int:
+    """Total size of the regular files under path (scandir walk, symlinks not followed)."""
+    total = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
+def _is_vosk_model_dir(path: str) -> bool:
+    """Whether path holds a Vosk model (am/final.mdl, possibly under model/)."""
+    for marker in (("am", "final.mdl"), ("model", "am", "final.mdl")):
+        try:
+            os.stat(os.path.join(path, *marker))
+            return True
+        except FileNotFoundError:
+            continue
+    return False
+
+
+def _cpu_supports_bf16() -> bool:
+    """Whether the CPU has native BF16 matmul (AMX or AVX512-BF16), per torch's own probes."""
+    if not TORCH_AVAILABLE:
+        return False
+    for probe in ("_is_amx_tile_supported", "_is_avx512_bf16_supported"):
+        check = getattr(torch.cpu, probe, None)
+        if check is not None and check():
+            return True
+    return False
 
 
 # ============================================
@@ -174,12 +270,22 @@ class VoiceManager:
         self._settings = VoiceSettings()
         self._tts_model = None
         self._tts_voice_state = None  # Pocket TTS voice state
+        self._voice_state_cache: "OrderedDict[str, Any]" = OrderedDict()  # voice_path -> state (LRU)
         self._stt_model = None
         self._stt_recognizer = None
-        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._stt_pending = bytearray()  # PCM16 not yet fed to Vosk (less than one frame)
+        # Separate pools so a zip extraction or STT load never queues behind TTS warm-up
+        self._tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        self._stt_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt")
+        self._io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="voice-io")
         self._stop_event = threading.Event()
         self._tts_lock = threading.Lock()
+        # One long-lived thread runs TTS jobs instead of a new thread per utterance
+        self._tts_jobs: "queue_module.Queue[Callable[[], None]]" = queue_module.Queue()
+        threading.Thread(target=self._tts_loop, name="tts-generate", daemon=True).start()
         self._voices_dir: Optional[Path] = None
+        self._stt_size_cache: Dict[str, Tuple[float, int]] = {}  # name -> (dir mtime, bytes)
+        self._http_client = None  # Shared httpx.AsyncClient for model downloads (see _get_http_client)
         
         self._init_paths()
     
@@ -257,6 +363,29 @@ class VoiceManager:
             "tts_cache_dir": str(self._tts_cache_dir) if self._tts_cache_dir else None,
         }
     
+    def prefetch_tts_voices(self):
+        """Start downloading the preset voice embeddings in the background."""
+        if not (TORCH_AVAILABLE and POCKET_TTS_AVAILABLE):
+            return
+        
+        def _prefetch():
+            try:
+                set_tts_cache_directory(self._tts_cache_dir)
+                prefetch_predefined_voices()
+                logger.info("Preset TTS voices prefetched")
+            except Exception as e:
+                logger.warning("Preset TTS voice prefetch failed: %s", e)
+        
+        self._tts_executor.submit(_prefetch)
+    
+    def _sync_app_settings(self):
+        """Copy the user-facing TTS options from app settings; they apply on the next TTS load."""
+        from ..config import get_settings_manager
+        voice = get_settings_manager().settings.voice
+        self._settings.tts_quantize = voice.tts_quantize
+        self._settings.tts_quantize_groups = tuple(voice.tts_quantize_groups)
+        self._settings.tts_bf16 = voice.tts_bf16
+    
     def update_settings(self, **kwargs):
         """Update voice settings."""
         for key, value in kwargs.items():
@@ -271,19 +400,79 @@ class VoiceManager:
         """List available STT models."""
         models = []
         if self._stt_models_dir and self._stt_models_dir.exists():
-            for d in self._stt_models_dir.iterdir():
-                if d.is_dir():
-                    # Check for vosk model markers
-                    is_vosk = (d / "am" / "final.mdl").exists() or (d / "model" / "am" / "final.mdl").exists()
-                    size = sum(f.stat().st_size for f in d.rglob("*") if f.is_file())
-                    models.append({
-                        "name": d.name,
-                        "path": str(d),
-                        "type": "vosk" if is_vosk else "unknown",
-                        "size": size,
-                    })
+            with os.scandir(self._stt_models_dir) as entries:
+                dirs = [e for e in entries if e.is_dir()]
+            for d in dirs:
+                is_vosk = _is_vosk_model_dir(d.path)
+                if is_vosk:
+                    # Installed models don't change; re-walk only if the directory was touched
+                    mtime = d.stat().st_mtime
+                    cached = self._stt_size_cache.get(d.name)
+                    if cached is not None and cached[0] == mtime:
+                        size = cached[1]
+                    else:
+                        size = _dir_size(d.path)
+                        self._stt_size_cache[d.name] = (mtime, size)
+                else:
+                    size = 0  # Not a model; don't walk it
+                models.append({
+                    "name": d.name,
+                    "path": d.path,
+                    "type": "vosk" if is_vosk else "unknown",
+                    "size": size,
+                })
         return models
     
+    def _get_http_client(self):
+        """Get the shared download client (HTTP/2 when the h2 package is installed)."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                http2=importlib.util.find_spec("h2") is not None,
+                timeout=600.0,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+            )
+        return self._http_client
+    
+    async def close_http_client(self):
+        """Close the shared download client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    async def _download_ranges(self, url: str, f, total: int, progress: List[int]) -> bool:
+        """
+        Download url into the preallocated file f with parallel range requests.
+        Adds received bytes to progress[0]. Returns False if the server ignored the ranges.
+        """
+        client = self._get_http_client()
+        part_size = -(-total // _STT_PARALLEL_PARTS)
+        
+        async def _fetch(start: int, end: int):
+            async with client.stream("GET", url, headers={"Range": f"bytes={start}-{end}"}) as response:
+                if response.status_code != 206:
+                    raise _RangesIgnored(response.status_code)
+                offset = start
+                async for chunk in response.aiter_bytes(chunk_size=1 << 20):
+                    # No await between seek and write, so the parts can share one handle
+                    f.seek(offset)
+                    f.write(chunk)
+                    offset += len(chunk)
+                    progress[0] += len(chunk)
+        
+        tasks = [
+            asyncio.ensure_future(_fetch(start, min(start + part_size, total) - 1))
+            for start in range(0, total, part_size)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except _RangesIgnored:
+            return False
+        finally:
+            for task in tasks:
+                task.cancel()
+        return True
+    
     async def download_stt_model(
         self,
         model_name: str = "vosk-model-small-en-us-0.15",
@@ -293,10 +482,6 @@ class VoiceManager:
         Download a Vosk STT model from the official alphacep server.
         Yields progress events.
         """
-        import zipfile
-        import shutil
-        import httpx
-        
         # Official alphacep model URLs
         VOSK_MODELS = {
             "vosk-model-small-en-us-0.15": "https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip",
@@ -323,11 +508,41 @@ class VoiceManager:
         
         yield {"type": "progress", "percent": 0, "message": f"Downloading {model_name}..."}
         
-        zip_path = self._stt_models_dir / f"{model_name}.zip"
+        # Small models stay in memory; larger ones spill to a temp file in the models dir
+        spool = tempfile.SpooledTemporaryFile(max_size=64 << 20, dir=self._stt_models_dir)
         
         try:
-            # Download with progress
-            async with httpx.AsyncClient(timeout=600.0) as client:
+            client = self._get_http_client()
+            head = await client.head(model_url)
+            total = int(head.headers.get("content-length", 0)) if head.status_code == 200 else 0
+            ranged = (
+                total >= _STT_PARALLEL_MIN_SIZE
+                and head.headers.get("accept-ranges", "").lower() == "bytes"
+            )
+            
+            if ranged:
+                # Large model: parallel range requests into a preallocated file
+                progress = [0]
+                spool.truncate(total)  # Past max_size, so this rolls over to disk
+                task = asyncio.ensure_future(self._download_ranges(model_url, spool, total, progress))
+                try:
+                    last_percent = -1
+                    while not task.done():
+                        await asyncio.wait({task}, timeout=0.5)
+                        percent = int((progress[0] / total) * 100)
+                        if percent != last_percent:
+                            last_percent = percent
+                            yield {"type": "progress", "percent": percent, "message": f"Downloading... {progress[0] // 1024 // 1024}MB / {total // 1024 // 1024}MB"}
+                finally:
+                    task.cancel()
+                ranged = task.result()
+                if not ranged:
+                    logger.info("Server ignored range requests for %s, downloading in one stream", model_url)
+                    spool.seek(0)
+                    spool.truncate()
+            
+            if not ranged:
+                # Download with progress
                 async with client.stream("GET", model_url) as response:
                     if response.status_code != 200:
                         yield {"type": "error", "message": f"Download failed: HTTP {response.status_code}"}
@@ -335,13 +550,16 @@ class VoiceManager:
                     
                     total = int(response.headers.get("content-length", 0))
                     downloaded = 0
+                    last_percent = -1
                     
-                    with open(zip_path, "wb") as f:
-                        async for chunk in response.aiter_bytes(chunk_size=8192):
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total > 0:
-                                percent = int((downloaded / total) * 100)
+                    async for chunk in response.aiter_bytes(chunk_size=1 << 20):
+                        spool.write(chunk)
+                        downloaded += len(chunk)
+                        if total > 0:
+                            # One event per whole percent, not per chunk
+                            percent = int((downloaded / total) * 100)
+                            if percent != last_percent:
+                                last_percent = percent
                                 yield {"type": "progress", "percent": percent, "message": f"Downloading... {downloaded // 1024 // 1024}MB / {total // 1024 // 1024}MB"}
             
             yield {"type": "progress", "percent": 100, "message": "Extracting..."}
@@ -349,23 +567,21 @@ class VoiceManager:
             # Extract the zip file
             loop = asyncio.get_running_loop()
             def _extract():
-                with zipfile.ZipFile(zip_path, 'r') as zf:
+                spool.seek(0)
+                with zipfile.ZipFile(spool, 'r') as zf:
                     zf.extractall(self._stt_models_dir)
-                zip_path.unlink()  # Remove zip after extraction
             
-            await loop.run_in_executor(self._executor, _extract)
+            await loop.run_in_executor(self._io_executor, _extract)
             
             yield {"type": "done", "path": str(target_dir), "message": "Download complete"}
             
         except Exception as e:
-            # Cleanup on error
-            if zip_path.exists():
-                zip_path.unlink()
             yield {"type": "error", "message": str(e)}
+        finally:
+            spool.close()
     
     def delete_stt_model(self, model_name: str) -> bool:
         """Delete an STT model."""
-        import shutil
         target_dir = self._stt_models_dir / model_name
         if target_dir.exists():
             shutil.rmtree(target_dir)
@@ -394,6 +610,7 @@ class VoiceManager:
         """Save a voice file for cloning."""
         voice_path = self._voices_dir / f"{name}.{format}"
         voice_path.write_bytes(audio_bytes)
+        self._voice_state_cache.pop(str(voice_path), None)
         return {
             "name": name,
             "path": str(voice_path),
@@ -406,6 +623,7 @@ class VoiceManager:
         for f in self._voices_dir.iterdir():
             if f.stem == name:
                 f.unlink()
+                self._voice_state_cache.pop(str(f), None)
                 return True
         return False
     
@@ -429,46 +647,56 @@ class VoiceManager:
             logger.error("Pocket TTS not installed")
             return False
         
+        self._sync_app_settings()
+        
         def _load():
-            logger.info(f"Loading Pocket TTS model (cache: {self._tts_cache_dir})...")
+            logger.info("Loading Pocket TTS model (cache: %s)...", self._tts_cache_dir)
             
             try:
                 # Load Pocket TTS with custom cache directory
-                model = PocketTTSModel.load_model(cache_dir=self._tts_cache_dir)
+                self._voice_state_cache.clear()
+                model = PocketTTSModel.load_model(
+                    cache_dir=self._tts_cache_dir,
+                    quantize=self._settings.tts_quantize,
+                    quantize_groups=tuple(self._settings.tts_quantize_groups),
+                )
+                # BF16 autocast only for fp32 Linear layers; dynamic int8 kernels take fp32 input
+                if self._settings.tts_bf16 and not self._settings.tts_quantize and _cpu_supports_bf16():
+                    model.autocast_dtype = torch.bfloat16
+                    logger.info("Pocket TTS FlowLM running under BF16 autocast")
                 self._tts_model = model
                 
                 # Determine voice to use
                 voice = voice_name or self._settings.voice_prompt_path or "alba"
                 
-                # Preset voices that work without gated access
-                PRESET_VOICES = {"alba", "marius", "javert", "jean", "fantine", "cosette", "eponine", "azelma"}
-                
                 # Try to set initial voice state
                 try:
-                    if voice in PRESET_VOICES:
+                    if voice in _PRESET_VOICES:
                         # Use preset voice directly
                         self._tts_voice_state = model.get_state_for_audio_prompt(voice)
-                        logger.info(f"Pocket TTS loaded with preset voice: {voice}")
+                        logger.info("Pocket TTS loaded with preset voice: %s", voice)
                     else:
                         # Try to use custom voice file (requires gated model)
                         self._tts_voice_state = model.get_state_for_audio_prompt(voice)
-                        logger.info(f"Pocket TTS loaded with custom voice: {voice}")
+                        logger.info("Pocket TTS loaded with custom voice: %s", voice)
                 except ValueError as e:
                     # Voice cloning not available - fallback to preset
-                    logger.warning(f"Voice cloning not available ({e}), falling back to 'alba' preset")
-                    self._tts_voice_state = model.get_state_for_audio_prompt("alba")
+                    logger.warning("Voice cloning not available (%s), falling back to 'alba' preset", e)
+                    voice = "alba"
+                    self._tts_voice_state = model.get_state_for_audio_prompt(voice)
                     logger.info("Pocket TTS loaded with fallback voice: alba")
+                # Requests that name the default voice explicitly reuse its state
+                self._voice_state_cache[voice] = self._tts_voice_state
                 
-                logger.info(f"TTS sample_rate={model.sample_rate}")
+                logger.info("TTS sample_rate=%d", model.sample_rate)
                 return True
             except Exception as e:
-                logger.error(f"Failed to load Pocket TTS: {e}")
-                import traceback
+                logger.error("Failed to load Pocket TTS: %s", e)
                 traceback.print_exc()
                 return False
         
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _load)
+        return await loop.run_in_executor(self._tts_executor, _load)
     
     def unload_tts(self):
         """Unload TTS model."""
@@ -476,9 +704,34 @@ class VoiceManager:
             del self._tts_model
             self._tts_model = None
             self._tts_voice_state = None
+            self._voice_state_cache.clear()
             gc.collect()
             logger.info("TTS model unloaded")
     
+    def _tts_loop(self):
+        """Run submitted TTS jobs one at a time (each job handles its own errors)."""
+        while True:
+            job = self._tts_jobs.get()
+            try:
+                job()
+            except Exception:
+                logger.exception("TTS job failed")
+    
+    def _voice_state_for(self, voice_path: str) -> Any:
+        """
+        Prompted state for a voice, encoding the reference audio only on a cache miss.
+        Call with _tts_lock held; generation must use copy_state=True to keep it intact.
+        """
+        state = self._voice_state_cache.get(voice_path)
+        if state is not None:
+            self._voice_state_cache.move_to_end(voice_path)
+            return state
+        state = self._tts_model.get_state_for_audio_prompt(voice_path)
+        self._voice_state_cache[voice_path] = state
+        if len(self._voice_state_cache) > _VOICE_STATE_CACHE_SIZE:
+            self._voice_state_cache.popitem(last=False)
+        return state
+    
     async def generate_speech(
         self,
         text: str,
@@ -495,7 +748,23 @@ class VoiceManager:
         self._stop_event.clear()
         
         loop = asyncio.get_running_loop()
-        queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        # Chunks are handed over through a deque; the worker only schedules a loop
+        # wakeup when none is pending, and each wakeup drains everything queued so far
+        pending: deque = deque()
+        ready = asyncio.Event()
+        wake_scheduled = False
+        
+        def _wake():
+            nonlocal wake_scheduled
+            wake_scheduled = False
+            ready.set()
+        
+        def _push(item: Optional[bytes]):
+            nonlocal wake_scheduled
+            pending.append(item)
+            if not wake_scheduled:
+                wake_scheduled = True
+                loop.call_soon_threadsafe(_wake)
         
         def _worker():
             try:
@@ -503,7 +772,7 @@ class VoiceManager:
                     # Update voice state if a different voice is requested
                     voice_state = self._tts_voice_state
                     if voice_path:
-                        voice_state = self._tts_model.get_state_for_audio_prompt(voice_path)
+                        voice_state = self._voice_state_for(voice_path)
                     
                     # Pocket TTS has native streaming
                     for audio_chunk in self._tts_model.generate_audio_stream(
@@ -513,24 +782,30 @@ class VoiceManager:
                     ):
                         if self._stop_event.is_set():
                             break
-                        # Convert to PCM16 bytes
-                        audio_np = audio_chunk.cpu().numpy()
-                        pcm_bytes = (audio_np * 32767).astype(np.int16).tobytes()
-                        loop.call_soon_threadsafe(queue.put_nowait, pcm_bytes)
+                        # Convert to PCM16 bytes (clipped, so loud samples can't wrap)
+                        _push(wav_to_pcm16_bytes(audio_chunk))
             except Exception as e:
-                logger.error(f"TTS generation error: {e}")
-                import traceback
+                logger.error("TTS generation error: %s", e)
                 traceback.print_exc()
             finally:
-                loop.call_soon_threadsafe(queue.put_nowait, None)
+                _push(None)
         
-        threading.Thread(target=_worker, daemon=True).start()
+        self._tts_jobs.put(_worker)
         
-        while True:
-            chunk = await queue.get()
-            if chunk is None:
-                break
-            yield chunk
+        done = False
+        while not done:
+            await ready.wait()
+            ready.clear()
+            batch = []
+            while pending:
+                chunk = pending.popleft()
+                if chunk is None:
+                    done = True
+                    break
+                batch.append(chunk)
+            if batch:
+                # Consecutive PCM16 chunks concatenate into one contiguous chunk
+                yield batch[0] if len(batch) == 1 else b"".join(batch)
     
     def stop_tts(self):
         """Stop current TTS generation."""
@@ -571,14 +846,14 @@ class VoiceManager:
                     self._stt_model,
                     16000  # Vosk expects 16kHz audio
                 )
-                logger.info(f"Vosk STT loaded from {model_path_to_use}")
+                logger.info("Vosk STT loaded from %s", model_path_to_use)
                 return True
             except Exception as e:
-                logger.error(f"Failed to load STT model: {e}")
+                logger.error("Failed to load STT model: %s", e)
                 return False
         
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _load)
+        return await loop.run_in_executor(self._stt_executor, _load)
     
     def unload_stt(self):
         """Unload STT model."""
@@ -587,27 +862,41 @@ class VoiceManager:
             del self._stt_recognizer
             self._stt_model = None
             self._stt_recognizer = None
+            self._stt_pending.clear()
             logger.info("STT model unloaded")
     
-    def process_audio_chunk(self, pcm16_bytes: bytes) -> Dict[str, Any]:
+    def process_audio_chunk(self, pcm16_bytes: bytes, final: bool = False) -> Dict[str, Any]:
         """
         Process an audio chunk for STT.
         Returns partial or final transcription.
+        
+        Audio is fed in whole 100 ms frames; a trailing partial frame is held until the
+        next chunk, or fed immediately when final is set (end of the utterance).
         """
         if not self.is_stt_loaded:
             return {"error": "STT not loaded"}
         
-        if self._stt_recognizer.AcceptWaveform(pcm16_bytes):
-            import json
-            result = json.loads(self._stt_recognizer.Result())
+        recognizer = self._stt_recognizer
+        pending = self._stt_pending
+        if not pending and (final or len(pcm16_bytes) % _STT_FRAME_BYTES == 0):
+            # Already frame-aligned: hand the caller's bytes straight through
+            data = pcm16_bytes
+        else:
+            pending += pcm16_bytes
+            usable = len(pending) if final else len(pending) - len(pending) % _STT_FRAME_BYTES
+            data = bytes(pending[:usable])
+            del pending[:usable]
+        
+        if data and recognizer.AcceptWaveform(data):
+            result = loads_json(recognizer.Result())
             return {"type": "final", "text": result.get("text", "")}
         else:
-            import json
-            result = json.loads(self._stt_recognizer.PartialResult())
+            result = loads_json(recognizer.PartialResult())
             return {"type": "partial", "text": result.get("partial", "")}
     
     def reset_stt(self):
         """Reset STT recognizer state."""
+        self._stt_pending.clear()
         if self._stt_recognizer:
             # Create new recognizer to reset state
             self._stt_recognizer = KaldiRecognizer(self._stt_model, 16000)
@@ -636,4 +925,5 @@ async def close_voice_manager():
     if _voice_manager is not None:
         _voice_manager.unload_tts()
         _voice_manager.unload_stt()
+        await _voice_manager.close_http_client()
         _voice_manager = None
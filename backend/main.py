@@ -16,7 +16,7 @@ from fastapi.responses import FileResponse
 
 from .config import get_settings, API_PREFIX
 from .models import init_database
-from .core import close_model_manager, get_model_manager, close_voice_manager
+from .core import close_model_manager, get_model_manager, close_voice_manager, get_voice_manager
 from .routes import (
     chat_router,
     models_router,
@@ -48,6 +48,11 @@ async def lifespan(app: FastAPI):
     else:
         print("⚠️  No GPU detected - using CPU (will be slower)")
     
+    # Fill the preset voice cache in the background instead of on first TTS use
+    voice_settings = get_settings().voice
+    if voice_settings.tts_enabled and voice_settings.prefetch_tts_voices:
+        get_voice_manager().prefetch_tts_voices()
+    
     yield
     
     # Shutdown
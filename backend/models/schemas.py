@@ -4,7 +4,7 @@ Request/Response models for API endpoints.
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -260,6 +260,7 @@ class ModelSettingsUpdate(BaseModel):
     default_quantization: Optional[str] = None
     auto_load_last: Optional[bool] = None
     use_torch_compile: Optional[bool] = None
+    use_static_cache: Optional[bool] = None
     attention_implementation: Optional[str] = None  # "auto", "flash_attention_2", "sdpa", "eager"
 
 
@@ -286,11 +287,28 @@ class SpeculativeDecodingSettingsUpdate(BaseModel):
     assistant_tokens_schedule: Optional[str] = None  # "constant" or "heuristic"
 
 
+class VoiceSettingsUpdate(BaseModel):
+    tts_enabled: Optional[bool] = None
+    stt_enabled: Optional[bool] = None
+    tts_device: Optional[str] = None  # "auto", "cuda", "cpu"
+    tts_model: Optional[str] = None  # "turbo" or "standard"
+    active_voice: Optional[str] = None
+    vad_aggressiveness: Optional[int] = Field(None, ge=0, le=3)
+    chunk_max_words: Optional[int] = Field(None, ge=1)
+    chunk_max_wait_s: Optional[float] = Field(None, gt=0.0)
+    auto_load_tts: Optional[bool] = None
+    prefetch_tts_voices: Optional[bool] = None
+    tts_quantize: Optional[bool] = None
+    tts_quantize_groups: Optional[List[Literal["attention", "ffn"]]] = None
+    tts_bf16: Optional[bool] = None
+
+
 class SettingsUpdate(BaseModel):
     storage: Optional[StorageSettingsUpdate] = None
     model: Optional[ModelSettingsUpdate] = None
     chat_defaults: Optional[ChatDefaultsUpdate] = None
     ui: Optional[UISettingsUpdate] = None
+    voice: Optional[VoiceSettingsUpdate] = None
     speculative_decoding: Optional[SpeculativeDecodingSettingsUpdate] = None
 
 
@@ -301,6 +319,7 @@ class SettingsResponse(BaseModel):
     model: Dict[str, Any]
     chat_defaults: Dict[str, Any]
     ui: Dict[str, Any]
+    voice: Optional[Dict[str, Any]] = None
     speculative_decoding: Optional[Dict[str, Any]] = None
 
 
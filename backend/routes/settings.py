@@ -6,7 +6,7 @@ API endpoints for application settings.
 from fastapi import APIRouter
 
 from ..models.schemas import SettingsUpdate, SettingsResponse
-from ..config import get_settings, get_settings_manager
+from ..config import get_settings_manager
 
 
 router = APIRouter(prefix="/settings", tags=["settings"])
@@ -15,8 +15,8 @@ router = APIRouter(prefix="/settings", tags=["settings"])
 @router.get("")
 async def get_settings_endpoint():
     """Get current application settings."""
-    settings = get_settings()
     manager = get_settings_manager()
+    settings = await manager.arefresh()
     
     return {
         "app_name": settings.app_name,
@@ -31,6 +31,7 @@ async def get_settings_endpoint():
         "model": settings.model.model_dump(),
         "chat_defaults": settings.chat_defaults.model_dump(),
         "ui": settings.ui.model_dump(),
+        "voice": settings.voice.model_dump(),
         "speculative_decoding": settings.speculative_decoding.model_dump(),
     }
 
@@ -54,10 +55,13 @@ async def update_settings(data: SettingsUpdate):
     if data.ui:
         update_data['ui'] = data.ui.model_dump(exclude_unset=True)
     
+    if data.voice:
+        update_data['voice'] = data.voice.model_dump(exclude_unset=True)
+    
     if data.speculative_decoding:
         update_data['speculative_decoding'] = data.speculative_decoding.model_dump(exclude_unset=True)
     
-    new_settings = manager.update(**update_data)
+    new_settings = await manager.aupdate(**update_data)
     
     return {
         "success": True,
@@ -68,6 +72,7 @@ async def update_settings(data: SettingsUpdate):
             "model": new_settings.model.model_dump(),
             "chat_defaults": new_settings.chat_defaults.model_dump(),
             "ui": new_settings.ui.model_dump(),
+            "voice": new_settings.voice.model_dump(),
             "speculative_decoding": new_settings.speculative_decoding.model_dump(),
         }
     }
@@ -77,7 +82,7 @@ async def update_settings(data: SettingsUpdate):
 async def reset_settings():
     """Reset all settings to defaults."""
     manager = get_settings_manager()
-    new_settings = manager.reset_to_defaults()
+    new_settings = await manager.areset_to_defaults()
     
     return {
         "success": True,
@@ -89,6 +94,7 @@ async def reset_settings():
             "model": new_settings.model.model_dump(),
             "chat_defaults": new_settings.chat_defaults.model_dump(),
             "ui": new_settings.ui.model_dump(),
+            "voice": new_settings.voice.model_dump(),
             "speculative_decoding": new_settings.speculative_decoding.model_dump(),
         }
     }
@@ -19,6 +19,7 @@ from ..core import (
     create_done_event,
     create_error_event,
     create_status_event,
+    loads_json,
 )
 from ..services import get_chat_service
 from ..models import VoiceModel
@@ -28,6 +29,18 @@ router = APIRouter(prefix="/voice", tags=["voice"])
 logger = logging.getLogger("ultrachat.voice.routes")
 
 
+def _parse_sse_frame(frame: bytes):
+    """Split an SSE frame into (event type, data payload); either may be None."""
+    event_type = None
+    payload = None
+    for line in frame.split(b"\n"):
+        if line.startswith(b"event: "):
+            event_type = line[7:].decode("utf-8")
+        elif line.startswith(b"data: "):
+            payload = line[6:]
+    return event_type, payload
+
+
 # ============================================
 # REST Endpoints
 # ============================================
@@ -191,6 +204,7 @@ async def download_stt_model(model_name: str):
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
         }
     )
 
@@ -461,6 +475,10 @@ async def websocket_stt(ws: WebSocket):
                 # JSON message
                 data = json.loads(message["text"])
                 if data.get("type") == "reset":
+                    # Feed the held partial frame before dropping recognizer state
+                    result = manager.process_audio_chunk(b"", final=True)
+                    if "error" not in result and result.get("text"):
+                        await ws.send_json(result)
                     manager.reset_stt()
                     await ws.send_json({"type": "reset_done"})
             
@@ -552,8 +570,10 @@ async def websocket_voice_chat(ws: WebSocket):
         
         logger.info(f"[VOICE-CHAT] Processing speech from {audio_chunk_count} audio chunks, total bytes: {len(audio_buffer)}")
         
-        # Get final transcription
-        result = voice_manager.process_audio_chunk(bytes(audio_buffer))
+        # Get final transcription from the whole utterance. The streamed chunks already left
+        # their tail in the recognizer's pending frame, so start clean rather than prepend it.
+        voice_manager.reset_stt()
+        result = voice_manager.process_audio_chunk(bytes(audio_buffer), final=True)
         audio_buffer.clear()
         audio_chunk_count = 0
         voice_manager.reset_stt()
@@ -595,51 +615,55 @@ async def websocket_voice_chat(ws: WebSocket):
                     logger.info("[VOICE-CHAT] Stop event set, breaking LLM stream")
                     break
                 
-                # Parse SSE event
-                if event.startswith("data: "):
-                    try:
-                        data = json.loads(event[6:])
-                        event_type = data.get("type")
-                        
-                        if event_type == "token":
-                            token = data.get("content", "")
-                            token_count += 1
-                            full_response += token
-                            
-                            if token_count % 10 == 0:
-                                logger.debug(f"[VOICE-CHAT] LLM token #{token_count}")
-                            
-                            await ws.send_json({"type": "llm_token", "token": token})
-                            
-                            # Chunk for TTS
-                            chunk = chunker.feed(token)
-                            if chunk:
-                                logger.debug(f"[VOICE-CHAT] Text chunk ready: '{chunk[:50]}...'")
-                                await text_queue.put(chunk)
-                        
-                        elif event_type == "done":
-                            logger.info(f"[VOICE-CHAT] LLM done, total tokens: {token_count}, response length: {len(full_response)}")
-                            # Flush remaining text
-                            tail = chunker.flush()
-                            if tail:
-                                logger.debug(f"[VOICE-CHAT] Flushing final chunk: '{tail[:50]}...'")
-                                await text_queue.put(tail)
-                            await text_queue.put(None)  # Sentinel
-                            
-                            # Update conversation ID for future turns
-                            config["conversation_id"] = data.get("conversation_id")
-                        
-                        elif event_type == "error":
-                            logger.error(f"[VOICE-CHAT] LLM error: {data.get('message')}")
-                            await ws.send_json({
-                                "type": "error",
-                                "message": data.get("message", "Unknown error")
-                            })
-                            await text_queue.put(None)
+                # Parse SSE frame: "event: <type>\ndata: <json>\n\n" (optionally with an "id:" line)
+                event_type, payload = _parse_sse_frame(event)
+                if payload is None:
+                    continue
+                try:
+                    data = loads_json(payload)
+                except json.JSONDecodeError as e:
+                    logger.error(f"[VOICE-CHAT] JSON decode error: {e}")
+                    continue
+                
+                if event_type == "token":
+                    token = data.get("token", "")
+                    token_count += 1
+                    full_response += token
+                    
+                    if token_count % 10 == 0:
+                        logger.debug(f"[VOICE-CHAT] LLM token #{token_count}")
+                    
+                    await ws.send_json({"type": "llm_token", "token": token})
+                    
+                    # Chunk for TTS
+                    chunk = chunker.feed(token)
+                    if chunk:
+                        logger.debug(f"[VOICE-CHAT] Text chunk ready: '{chunk[:50]}...'")
+                        await text_queue.put(chunk)
+                
+                elif event_type == "done":
+                    logger.info(f"[VOICE-CHAT] LLM done, total tokens: {token_count}, response length: {len(full_response)}")
+                    # Flush remaining text
+                    tail = chunker.flush()
+                    if tail:
+                        logger.debug(f"[VOICE-CHAT] Flushing final chunk: '{tail[:50]}...'")
+                        await text_queue.put(tail)
                     
-                    except json.JSONDecodeError as e:
-                        logger.error(f"[VOICE-CHAT] JSON decode error: {e}")
-                        pass
+                    # Update conversation ID for future turns
+                    if data.get("conversation_id"):
+                        config["conversation_id"] = data["conversation_id"]
+                    break
+                
+                elif event_type == "error":
+                    logger.error(f"[VOICE-CHAT] LLM error: {data.get('error')}")
+                    await ws.send_json({
+                        "type": "error",
+                        "message": data.get("error", "Unknown error")
+                    })
+                    break
+            
+            # Always release the TTS worker, including on stop or an unterminated stream
+            await text_queue.put(None)  # Sentinel
         
         async def tts_worker():
             """Process text chunks and stream audio."""
@@ -14,6 +14,8 @@ from ..core import (
     create_done_event,
     create_error_event,
     create_status_event,
+    BoundedEventQueue,
+    sse_stream,
     FLASH_ATTN_AVAILABLE,
 )
 from ..models import ModelRegistry
@@ -171,7 +173,6 @@ class ModelService:
         """
         import asyncio
         import time
-        from queue import Queue, Empty
         
         # Normalize - if single string passed, convert to list
         if isinstance(quantizations, str):
@@ -179,9 +180,11 @@ class ModelService:
         quantizations = normalize_quantization_list(quantizations)
         display_quants = [quantization_label(q) for q in quantizations]
         
-        # Queue for progress events from the download thread
-        progress_queue = Queue()
-        download_complete = False
+        # Queue for progress events from the download thread. Bounded: if this
+        # generator falls behind, the oldest progress ticks are dropped (the
+        # consumer only acts on the latest state anyway)
+        loop = asyncio.get_running_loop()
+        progress_queue = BoundedEventQueue(maxsize=256)
         download_error = None
         download_result = None
         
@@ -192,9 +195,30 @@ class ModelService:
                 "keep_cache": keep_cache,
             })
             
+            last_queued_status = None
+            last_queued_percent = -1.0
+            
             def progress_callback(progress):
                 """Called from download thread to report progress."""
-                progress_queue.put({
+                nonlocal last_queued_status, last_queued_percent
+                total = progress.total_bytes
+                if total > 0:
+                    percent = (progress.completed_bytes / total) * 100
+                elif progress.files_total > 0:
+                    # Phases without byte counts (e.g. snapshot_download) report whole files
+                    percent = (progress.files_completed / progress.files_total) * 100
+                else:
+                    percent = 0.0
+                # Hysteresis: drop byte-level updates that moved < 0.5% within the same phase
+                if (
+                    progress.status == last_queued_status
+                    and percent < 100.0
+                    and percent - last_queued_percent < 0.5
+                ):
+                    return
+                last_queued_status = progress.status
+                last_queued_percent = percent
+                loop.call_soon_threadsafe(on_progress, {
                     "status": progress.status,
                     "model_id": progress.model_id,
                     "current_file": progress.current_file,
@@ -202,12 +226,74 @@ class ModelService:
                     "total_bytes": progress.total_bytes,
                     "files_completed": progress.files_completed,
                     "files_total": progress.files_total,
-                    "percent": progress.percent,
+                    "percent": percent,
+                })
+            
+            last_status = ""
+            last_percent = None
+            last_emit_time = time.monotonic()
+            last_files_completed = 0
+            last_files_total = len(quantizations) if quantizations else 1
+            heartbeat_interval = 10.0  # Send heartbeat every 10 seconds to keep connection alive
+            
+            def on_progress(progress):
+                """Runs on the loop: frame the update if it is worth sending and queue it."""
+                nonlocal last_status, last_percent, last_emit_time, last_files_completed, last_files_total
+                status = progress.get("status", "")
+                percent = progress.get("percent", 0)
+                files_completed = progress.get("files_completed", last_files_completed)
+                files_total = progress.get("files_total", last_files_total)
+                
+                # Track the latest values
+                last_files_completed = files_completed
+                last_files_total = files_total
+                
+                # Only send if status changed, percent advanced, or the last event is stale
+                emit_due_to_time = (time.monotonic() - last_emit_time) > 2.0
+                percent_changed = (percent is not None and percent != last_percent)
+                is_progress_status = any(k in status for k in ("quantiz", "copying", "downloading", "saving", "converting", "loading"))
+                if status != last_status or (is_progress_status and percent_changed) or emit_due_to_time:
+                    last_status = status
+                    last_percent = percent
+                    last_emit_time = time.monotonic()
+                    
+                    # Map status to user-friendly messages
+                    message = self._get_progress_message(status, progress)
+                    
+                    progress_queue.offer_nowait(create_status_event(status, {
+                        "model_id": model_id,
+                        "message": message,
+                        "quantizations": display_quants,
+                        "files_completed": files_completed,
+                        "files_total": files_total,
+                        "percent": progress.get("percent", 0),
+                    }))
+            
+            def heartbeat_event():
+                """Status heartbeat, only when no event went out for a while (keeps SSE connection alive)."""
+                nonlocal last_emit_time
+                if (time.monotonic() - last_emit_time) <= heartbeat_interval:
+                    return None
+                last_emit_time = time.monotonic()
+                # Determine current phase based on last status
+                if "quantiz" in last_status or "loading" in last_status:
+                    heartbeat_msg = "Model loading and quantization in progress (this can take several minutes)..."
+                elif "saving" in last_status:
+                    heartbeat_msg = "Saving quantized model to disk..."
+                else:
+                    heartbeat_msg = "Processing..."
+                
+                return create_status_event("heartbeat", {
+                    "model_id": model_id,
+                    "message": heartbeat_msg,
+                    "quantizations": display_quants,
+                    "files_completed": last_files_completed,
+                    "files_total": last_files_total,
                 })
             
             # Start the download in background
             async def run_download():
-                nonlocal download_complete, download_error, download_result
+                nonlocal download_error, download_result
                 try:
                     download_result = await self.manager.download_model(
                         model_id=model_id,
@@ -218,77 +304,15 @@ class ModelService:
                 except Exception as e:
                     download_error = e
                 finally:
-                    download_complete = True
+                    # Ends the event stream; progress callbacks were all scheduled before this
+                    progress_queue.offer_nowait(None)
             
             # Start download task
             download_task = asyncio.create_task(run_download())
             
-            # Poll for progress while download runs
-            last_status = ""
-            last_percent = None
-            last_emit_time = time.monotonic()
-            last_files_completed = 0
-            last_files_total = len(quantizations) if quantizations else 1
-            heartbeat_interval = 10.0  # Send heartbeat every 10 seconds to keep connection alive
-            
-            while not download_complete:
-                # Check for progress updates
-                try:
-                    while True:
-                        progress = progress_queue.get_nowait()
-                        status = progress.get("status", "")
-                        percent = progress.get("percent", 0)
-                        files_completed = progress.get("files_completed", last_files_completed)
-                        files_total = progress.get("files_total", last_files_total)
-                        
-                        # Track the latest values
-                        last_files_completed = files_completed
-                        last_files_total = files_total
-                        
-                        # Only yield if status changed, percent advanced, or periodic heartbeat
-                        emit_due_to_time = (time.monotonic() - last_emit_time) > 2.0
-                        percent_changed = (percent is not None and percent != last_percent)
-                        is_progress_status = any(k in status for k in ("quantiz", "copying", "downloading", "saving", "converting", "loading"))
-                        if status != last_status or (is_progress_status and percent_changed) or emit_due_to_time:
-                            last_status = status
-                            last_percent = percent
-                            last_emit_time = time.monotonic()
-                            
-                            # Map status to user-friendly messages
-                            message = self._get_progress_message(status, progress)
-                            
-                            yield create_status_event(status, {
-                                "model_id": model_id,
-                                "message": message,
-                                "quantizations": display_quants,
-                                "files_completed": files_completed,
-                                "files_total": files_total,
-                                "percent": progress.get("percent", 0),
-                            })
-                except Empty:
-                    pass
-                
-                # Send heartbeat if no events for a while (keeps SSE connection alive)
-                if (time.monotonic() - last_emit_time) > heartbeat_interval:
-                    last_emit_time = time.monotonic()
-                    # Determine current phase based on last status
-                    if "quantiz" in last_status or "loading" in last_status:
-                        heartbeat_msg = "Model loading and quantization in progress (this can take several minutes)..."
-                    elif "saving" in last_status:
-                        heartbeat_msg = "Saving quantized model to disk..."
-                    else:
-                        heartbeat_msg = "Processing..."
-                    
-                    yield create_status_event("heartbeat", {
-                        "model_id": model_id,
-                        "message": heartbeat_msg,
-                        "quantizations": display_quants,
-                        "files_completed": last_files_completed,
-                        "files_total": last_files_total,
-                    })
-                
-                # Small delay to prevent busy loop
-                await asyncio.sleep(0.5)
+            # Relay progress as it arrives; heartbeats fill idle stretches
+            async for frame in sse_stream(progress_queue, heartbeat_interval, heartbeat_event):
+                yield frame
             
             # Wait for download task to complete
             await download_task
@@ -419,7 +443,8 @@ class ModelService:
     async def unload_model(self) -> Dict[str, Any]:
         """Unload the current model from memory."""
         try:
-            self.manager.unload_model()
+            # Explicit unload: give the VRAM back to the driver, not just our allocator cache
+            self.manager.unload_model(force_empty=True)
             return {"success": True, "message": "Model unloaded"}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -464,7 +489,7 @@ class ModelService:
     async def unload_assistant_model(self) -> Dict[str, Any]:
         """Unload the assistant model from memory."""
         try:
-            self.manager.unload_assistant_model()
+            self.manager.unload_assistant_model(force_empty=True)
             return {"success": True, "message": "Assistant model unloaded"}
         except Exception as e:
             return {"success": False, "error": str(e)}
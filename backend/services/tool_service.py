@@ -7,6 +7,7 @@ import ast
 import operator
 import asyncio
 import json
+import threading
 from typing import Optional, Dict, Any, List, Callable
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
@@ -47,6 +48,8 @@ class ToolService:
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
         self._executor = ThreadPoolExecutor(max_workers=4)
+        self._client: Optional["httpx.Client"] = None  # Shared connection pool (see _get_client)
+        self._client_lock = threading.Lock()
         
         # Safe operators for calculator
         self._safe_operators = {
@@ -61,6 +64,14 @@ class ToolService:
             ast.UAdd: operator.pos,
         }
     
+    def _get_client(self) -> "httpx.Client":
+        """Get the shared HTTP client, so repeat fetches reuse pooled keep-alive connections."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(timeout=self.timeout)
+        return self._client
+    
     # ============================================
     # Tool Availability
     # ============================================
@@ -282,24 +293,23 @@ class ToolService:
                     "User-Agent": "UltraChat/1.0 (Local AI Assistant; https://github.com/ultrachat)"
                 }
                 
-                with httpx.Client(timeout=self.timeout) as client:
-                    response = client.get(search_url, params=params, headers=headers)
-                    response.raise_for_status()
-                    data = response.json()
+                response = self._get_client().get(search_url, params=params, headers=headers)
+                response.raise_for_status()
+                data = response.json()
+                
+                for page in data.get("pages", [])[:max_results]:
+                    # Fetch summary for each page
+                    title = page.get("title", "")
+                    page_key = page.get("key", "")
+                    description = page.get("description", "")
+                    excerpt = page.get("excerpt", "")
                     
-                    for page in data.get("pages", [])[:max_results]:
-                        # Fetch summary for each page
-                        title = page.get("title", "")
-                        page_key = page.get("key", "")
-                        description = page.get("description", "")
-                        excerpt = page.get("excerpt", "")
-                        
-                        results.append({
-                            "title": title,
-                            "description": description,
-                            "excerpt": excerpt.replace("<span class=\"searchmatch\">", "").replace("</span>", ""),
-                            "url": f"https://en.wikipedia.org/wiki/{page_key}"
-                        })
+                    results.append({
+                        "title": title,
+                        "description": description,
+                        "excerpt": excerpt.replace("<span class=\"searchmatch\">", "").replace("</span>", ""),
+                        "url": f"https://en.wikipedia.org/wiki/{page_key}"
+                    })
             except Exception as e:
                 return ToolResult(success=False, data=None, error=str(e))
             
@@ -331,12 +341,11 @@ class ToolService:
         def _fetch_sync():
             try:
                 # Fetch HTML
-                with httpx.Client(timeout=self.timeout, follow_redirects=True) as client:
-                    response = client.get(url, headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    })
-                    response.raise_for_status()
-                    html = response.text
+                response = self._get_client().get(url, follow_redirects=True, headers={
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                })
+                response.raise_for_status()
+                html = response.text
                 
                 # Extract readable content
                 text = trafilatura.extract(
@@ -34,6 +34,9 @@ export default function SettingsView({ onBack }) {
       chunk_max_words: 16,
       chunk_max_wait_s: 0.7,
       auto_load_tts: false,
+      prefetch_tts_voices: false,
+      tts_quantize: true,
+      tts_bf16: false,
     },
     speculative_decoding: {
       enabled: true,
@@ -152,6 +155,9 @@ export default function SettingsView({ onBack }) {
           chunk_max_words: 16,
           chunk_max_wait_s: 0.7,
           auto_load_tts: false,
+          prefetch_tts_voices: false,
+          tts_quantize: true,
+          tts_bf16: false,
         },
       })
     } catch (error) {
@@ -207,6 +213,9 @@ export default function SettingsView({ onBack }) {
           chunk_max_words: 16,
           chunk_max_wait_s: 0.7,
           auto_load_tts: false,
+          prefetch_tts_voices: false,
+          tts_quantize: true,
+          tts_bf16: false,
         },
       })
       toast.success('Settings reset to defaults')
@@ -388,6 +397,13 @@ export default function SettingsView({ onBack }) {
                 checked={settings.model.use_torch_compile || false}
                 onChange={(val) => updateSetting('model', 'use_torch_compile', val)}
               />
+              
+              <ToggleSetting
+                label="Static KV Cache (Experimental)"
+                description="Preallocate the KV cache so torch.compile can replay each decode step as a CUDA graph. First generation compiles. Not used with session cache or speculative decoding. Requires model reload."
+                checked={settings.model.use_static_cache || false}
+                onChange={(val) => updateSetting('model', 'use_static_cache', val)}
+              />
             </div>
           </section>
 
@@ -610,6 +626,27 @@ export default function SettingsView({ onBack }) {
                   checked={settings.voice?.auto_load_tts ?? false}
                   onChange={(val) => updateSetting('voice', 'auto_load_tts', val)}
                 />
+                
+                <ToggleSetting
+                  label="Prefetch preset voices"
+                  description="Download the built-in TTS voices when backend starts"
+                  checked={settings.voice?.prefetch_tts_voices ?? false}
+                  onChange={(val) => updateSetting('voice', 'prefetch_tts_voices', val)}
+                />
+                
+                <ToggleSetting
+                  label="Quantize TTS (int8)"
+                  description="Faster CPU TTS with slightly different audio; turn off for full-precision output (applies on next TTS load)"
+                  checked={settings.voice?.tts_quantize ?? true}
+                  onChange={(val) => updateSetting('voice', 'tts_quantize', val)}
+                />
+                
+                <ToggleSetting
+                  label="BF16 TTS on CPU"
+                  description="Faster TTS on CPUs with native BF16 when int8 quantization is off (applies on next TTS load)"
+                  checked={settings.voice?.tts_bf16 ?? false}
+                  onChange={(val) => updateSetting('voice', 'tts_bf16', val)}
+                />
               </div>
               
               {/* TTS Settings */}
@@ -0,0 +1,118 @@
+"""
+Test script for ULTRACHAT_* environment overrides in backend/config/settings.py.
+Checks nesting, JSON sections, malformed variables and config.json precedence.
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import settings as settings_module
+
+
+@contextmanager
+def ultrachat_env(**variables):
+    """Run with exactly these ULTRACHAT_* variables set, re-scanning the environment."""
+    saved = {k: v for k, v in os.environ.items() if k.startswith(settings_module.ENV_PREFIX)}
+    for name in saved:
+        del os.environ[name]
+    os.environ.update({settings_module.ENV_PREFIX + k: v for k, v in variables.items()})
+    settings_module._env_overrides.cache_clear()
+    settings_module._env_settings.cache_clear()
+    try:
+        yield
+    finally:
+        for name in [k for k in os.environ if k.startswith(settings_module.ENV_PREFIX)]:
+            del os.environ[name]
+        os.environ.update(saved)
+        settings_module._env_overrides.cache_clear()
+        settings_module._env_settings.cache_clear()
+
+
+def test_scalar_override():
+    with ultrachat_env(PORT="9000", DEBUG="true"):
+        settings = settings_module._env_settings()
+    assert settings.port == 9000
+    assert settings.debug is True
+
+
+def test_nested_override():
+    with ultrachat_env(CHAT_DEFAULTS__TEMPERATURE="0.5"):
+        settings = settings_module._env_settings()
+    assert settings.chat_defaults.temperature == 0.5
+    # Other fields of the section keep their defaults
+    assert settings.chat_defaults.top_p == settings_module.AppSettings().chat_defaults.top_p
+
+
+def test_json_section_override():
+    with ultrachat_env(UI='{"theme": "light"}', UI__COMPACT_MODE="true"):
+        settings = settings_module._env_settings()
+    assert settings.ui.theme == "light"
+    assert settings.ui.compact_mode is True
+
+
+def test_malformed_variables_are_ignored():
+    with ultrachat_env(PORT__X="1", UI__THEME__X="1", STORAGE="5", MODEL="{not json"):
+        overrides = settings_module._env_overrides()
+        settings = settings_module._env_settings()
+    assert overrides == {}
+    defaults = settings_module.AppSettings()
+    assert settings.port == defaults.port
+    assert settings.ui == defaults.ui
+
+
+def test_unknown_variables_are_ignored():
+    with ultrachat_env(DATA_DIR="/tmp/ultrachat-test", NOT_A_SETTING="1"):
+        assert settings_module._env_overrides() == {}
+
+
+def test_config_file_beats_environment():
+    with ultrachat_env(PORT="9000", CHAT_DEFAULTS__TEMPERATURE="0.5", UI__THEME="light"):
+        settings = settings_module._parse_settings(b'{"port": 8123, "chat_defaults": {"top_k": 7}}')
+    assert settings.port == 8123
+    # Environment still fills in what the file leaves out, within a section too
+    assert settings.chat_defaults.temperature == 0.5
+    assert settings.chat_defaults.top_k == 7
+    assert settings.ui.theme == "light"
+
+
+def test_no_environment_uses_file_only():
+    with ultrachat_env():
+        settings = settings_module._parse_settings(b'{"port": 8123}')
+    assert settings.port == 8123
+    assert settings.chat_defaults == settings_module.AppSettings().chat_defaults
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        test_scalar_override,
+        test_nested_override,
+        test_json_section_override,
+        test_malformed_variables_are_ignored,
+        test_unknown_variables_are_ignored,
+        test_config_file_beats_environment,
+        test_no_environment_uses_file_only,
+    ]
+
+    print("=" * 60)
+    print("ULTRACHAT SETTINGS ENVIRONMENT TESTS")
+    print("=" * 60)
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)